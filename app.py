@@ -0,0 +1,4 @@
+"""RX-Pro for the branch named by ``RXPRO_APP_CONFIG``. Run with ``streamlit run app.py``."""
+from rxpro.app import run
+
+run()
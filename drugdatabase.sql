@@ -52,6 +52,8 @@ CREATE TABLE orders (
  orderdatetime datetime DEFAULT NULL,
  quantity int unsigned DEFAULT NULL,
  price int unsigned DEFAULT NULL,
+ -- first oid of the checkout this line belongs to; groups the lines of one sale
+ saleid int DEFAULT NULL,
  PRIMARY KEY (oid),
  CONSTRAINT fk04 FOREIGN KEY (pid) REFERENCES product (pid) ON DELETE CASCADE,
  CONSTRAINT fk05 FOREIGN KEY (sid) REFERENCES seller (sid) ON DELETE CASCADE,
@@ -77,24 +79,12 @@ DELIMITER ;
 DELIMITER //
 CREATE TRIGGER inventorytrigger AFTER INSERT ON orders
 FOR EACH ROW
-begin
-
-DECLARE qnty int;
-DECLARE productid varchar(20);
-
-SELECT   pid INTO productid
-FROM      orders
-ORDER BY  oid DESC
-LIMIT     1;
-
-SELECT   quantity INTO qnty 
-FROM      orders
-ORDER BY  oid DESC
-LIMIT     1;
-
-UPDATE inventory
-SET quantity=quantity-qnty
-WHERE pid=productid;
+BEGIN
+    -- Only the selling branch's row for this product. quantity is unsigned,
+    -- so an order larger than the stock fails instead of going negative.
+    UPDATE inventory
+    SET quantity = quantity - NEW.quantity
+    WHERE pid = NEW.pid AND sid = NEW.sid;
 END//
 
 DELIMITER ;
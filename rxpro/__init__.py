@@ -0,0 +1 @@
+"""Shared data layer for the RX-Pro AI pharmacy apps."""
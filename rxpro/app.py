@@ -0,0 +1,396 @@
+"""The RX-Pro Streamlit dashboards, shared by every branch.
+
+``run(config)`` draws the login / customer / admin pages for one
+``BranchConfig``; the launcher scripts (app.py, app4.py, app5.py, app6.py,
+kamps.py) only pick the branch. Importing this module touches no database;
+the schema is set up by ``init_db()`` on the first run.
+"""
+from concurrent.futures import CancelledError
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from rxpro.backend import (
+    InsufficientStock,
+    init_db, customer_add_data, customer_auth, drug_add_data, drug_next_id, drug_search,
+    drug_view_all_data, order_checkout, order_latest_data,
+    item_sales_report,
+)
+from rxpro.config import get_branch_config
+from rxpro.gemini import run_gemini_inference
+from rxpro.interactions import format_screening, plan_rx_check, screen_cart
+from rxpro.jobs import (
+    PENDING, RUNNING, UNKNOWN,
+    cancel_job, job_progress, job_progress_note, job_result, job_status, submit_streaming_job,
+)
+from rxpro.memory import get_memory
+from rxpro.orderlines import ITEM_REPORT_COLUMNS, expand_orders, order_rx_text, order_totals
+from rxpro.routing import count_rx_items, route_rx_check
+from rxpro.safety import NO_INSTRUCTIONS, render_safety_check
+from rxpro.ui import customers_view, drug_import_view, order_lines_view, sales_summary_download
+
+RX_POLL_SECONDS = 1
+RECEIPT_INSTRUCTION = "Print as Standard PoS Receipt"
+RX_INSTRUCTIONS = [
+    "Check dosage",
+    "Check drug interactions",
+    "Map to common allergies",
+    "Recommend substitute drugs",
+    RECEIPT_INSTRUCTION,
+]
+
+
+def checkout_receipt(config, username, O_id, cart_df, total):
+    cur = config.currency
+    lines = list(config.receipt_header) + [
+        f"Customer: {username}",
+        f"Date: {date.today()}",
+        f"Order ID: {O_id}",
+        "-----------------------------------------",
+    ]
+    for _, row in cart_df.iterrows():
+        lines.append(f"{row['Name']} (Qty: {row['Qty']}) - {cur}{row['Price']} each | "
+                     f"Subtotal: {cur}{row['Subtotal']}")
+    lines += [
+        "-----------------------------------------",
+        f"TOTAL: {cur}{total}",
+        f"Thank you for choosing {config.receipt_thanks}!",
+        "Reliable Patient Safety PoS 💚",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def order_receipt(config, username, order):
+    """:func:`checkout_receipt` for a saved ``(O_Name, O_Items, O_Qty, O_Prices, O_id)`` order."""
+    lines = expand_orders([order]).rename(columns={"Item": "Name"})
+    return checkout_receipt(config, username, order[4], lines, order_totals(lines)[1])
+
+
+# =====================================================
+# CUSTOMER DASHBOARD
+# =====================================================
+def customer_dashboard(config, username):
+    cur = config.currency
+    st.sidebar.success(f"Logged in as: {username}")
+    st.title("🏥 RX-PRO AI Pharmacy Dashboard")
+    tab1, tab2, tab3 = st.tabs(["📜 Order History", "🛒 New Order (POS)", "🤖 Check RX Safety"])
+
+    # ----------------- ORDER HISTORY -----------------
+    with tab1:
+        st.subheader("Your Order History")
+        if order_latest_data(username):
+            order_lines_view("history", cur, customer=username, total_label="Total All Orders")
+            sales_summary_download("history", username, qty_label=config.summary_qty_label)
+        else:
+            st.info("No orders yet. Go to the POS tab to place one.")
+
+    # ----------------- POS SYSTEM -----------------
+    with tab2:
+        st.subheader("🛒 Create a New Order")
+        drug_query = st.text_input("🔍 Search drugs (name, usage or ID)")
+        matches = drug_search(drug_query)
+        drug_names = [d[0] for d in matches]
+        catalog_prices = {d[0]: d[2] for d in matches}
+        if "cart" not in st.session_state:
+            st.session_state.cart = []
+
+        col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+        with col1:
+            product_choice = st.selectbox("Select Drug or Add New", ["-- New Product --"] + drug_names)
+        with col2:
+            qty = st.number_input("Quantity", min_value=1, value=1, step=1)
+        with col3:
+            price = st.number_input(f"Price ({cur})", min_value=1,
+                                    value=int(catalog_prices.get(product_choice) or 10), step=1)
+        new_name, new_use = "", ""
+        if product_choice == "-- New Product --":
+            new_name = st.text_input("New Product Name")
+            if config.pos_product_use:
+                new_use = st.text_input("Usage / Purpose", placeholder="e.g., Pain relief")
+        with col4:
+            if st.button("Add ➕"):
+                name = new_name if product_choice == "-- New Product --" else product_choice
+                if not name:
+                    st.warning("Please provide a product name.")
+                else:
+                    item = {"Name": name, "Qty": qty, "Price": price}
+                    if config.pos_product_use:
+                        item["Use"] = new_use
+                    if config.cart_drug_ids:
+                        item = {"ID": drug_next_id(), **item}
+                    st.session_state.cart.append(item)
+                    st.success(f"Added {qty} × {name}" + (f" (ID: {item['ID']})" if "ID" in item else ""))
+
+        if st.session_state.cart:
+            st.markdown("### 🧺 Current Order")
+            cart_df = pd.DataFrame(st.session_state.cart)
+            cart_df["Subtotal"] = cart_df["Qty"] * cart_df["Price"]
+            st.dataframe(cart_df, use_container_width=True)
+            for hit in screen_cart(cart_df["Name"].tolist()).hits:
+                st.warning(f"⚠️ Interaction: {hit.drug_a} + {hit.drug_b} ({hit.severity}) – {hit.description}")
+            total = cart_df["Subtotal"].sum()
+            st.markdown(f"### 💰 Total: {cur}{total}")
+
+            if st.button("💳 Complete Order"):
+                try:
+                    O_id = order_checkout(username, st.session_state.cart, default_use=config.default_use)
+                except InsufficientStock as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.session_state.cart.clear()
+                    st.success("✅ Order placed successfully!")
+                    if config.rx_check_hint:
+                        st.info("Perform RX Safety Check to Complete Order.")
+                    if config.receipt_header is not None:
+                        st.download_button(
+                            label="🧾 Download Receipt",
+                            data=checkout_receipt(config, username, O_id, cart_df, total).encode("utf-8"),
+                            file_name=f"{username}_receipt.txt",
+                            mime="text/plain"
+                        )
+        else:
+            st.info("Add products above to start your order.")
+
+    # ----------------- RX AI INFERENCE -----------------
+    with tab3:
+        st.subheader("🤖 RX Safety Check (Gemini 2.5 Flash / Pro)")
+        API_KEY = st.secrets.get("GEMINI_API_KEY", "")
+        if not API_KEY:
+            st.warning("Set GEMINI_API_KEY in Streamlit Secrets to enable AI inference.")
+
+        use_latest_order = st.checkbox("Use latest POS order as RX")
+        if config.rx_images:
+            uploaded_file = st.file_uploader("Or upload RX file (Text or Image)",
+                                             type=["txt", "jpeg", "jpg", "png"])
+        else:
+            uploaded_file = st.file_uploader("Or upload RX file (.txt)", type=["txt"])
+        options = [i for i in RX_INSTRUCTIONS if i != RECEIPT_INSTRUCTION or config.receipt_header is not None]
+        instructions = st.multiselect("Select Inference Instructions", options=options)
+
+        rx_text = ""
+        image_file = None
+        last_order = order_latest_data(username) if use_latest_order else None
+        if last_order:
+            rx_text = order_rx_text(last_order)
+        elif uploaded_file:
+            if uploaded_file.type.startswith("image/"):
+                image_file = uploaded_file
+            else:
+                rx_text = uploaded_file.read().decode("utf-8")
+
+        if rx_text or image_file:
+            st.text_area("RX Content Preview", rx_text if rx_text else "(Image provided)", height=200)
+            similar = get_memory().search(rx_text, k=3, min_score=0.5) if rx_text else []
+            if similar:
+                with st.expander(f"🧠 {len(similar)} similar past safety checks"):
+                    for match in similar:
+                        st.markdown(f"**{match.customer or 'Unknown'}** · {match.order_id or 'uploaded RX'} · "
+                                    f"{match.date} · similarity {match.score:.2f}")
+                        st.text(render_safety_check(match.result)[:1000])
+            if st.button("Run AI Inference"):
+                items = last_order[1].split(",") if last_order else []
+                # the receipt is printed here, never sent to the model
+                checks = [i for i in instructions if i != RECEIPT_INSTRUCTION]
+                receipt = ""
+                if RECEIPT_INSTRUCTION in instructions:
+                    receipt = (order_receipt(config, username, last_order) if last_order
+                               else "Select the latest POS order to print its receipt.")
+                llm_instructions, screening = plan_rx_check(items, checks)
+                instructions_text = "\n".join(llm_instructions)  # empty: the default safety review
+                route = route_rx_check(len(items) or count_rx_items(rx_text), llm_instructions,
+                                       image_file is not None)
+                if instructions and not llm_instructions:
+                    job_id = None  # answered entirely locally (interaction index and/or receipt)
+                else:
+                    job_id = submit_streaming_job(run_gemini_inference, rx_text, instructions_text, API_KEY,
+                                                  image_file=image_file, customer=username,
+                                                  order_id=last_order[4] if last_order else None,
+                                                  route=route)
+                st.session_state.rx_job = {
+                    "id": job_id,
+                    "model": (f"{route.tier.model} ({route.reason})" if job_id
+                              else "local interaction index" if checks else "none (receipt only)"),
+                    "rx_text": rx_text if rx_text else "(Image provided)",
+                    "instructions": (instructions_text or NO_INSTRUCTIONS) if job_id else "\n".join(instructions),
+                    "interactions": format_screening(screening),
+                    "receipt": receipt,
+                }
+        else:
+            st.info("Select latest POS order or upload a RX file"
+                    + ("/image" if config.rx_images else "") + " to run inference.")
+
+        if st.session_state.get("rx_job"):
+            show_rx_job(config, username)
+
+# =====================================================
+# RX SAFETY CHECK RESULT
+# =====================================================
+@st.fragment(run_every=RX_POLL_SECONDS)
+def show_rx_job(config, username):
+    job = st.session_state.rx_job
+    if "result" not in job and job["id"] is None:
+        job["result"] = "No AI call needed: answered locally."
+    if "result" not in job:
+        status = job_status(job["id"])
+        if status in (PENDING, RUNNING):
+            st.info("⏳ AI safety check running… you can keep ringing up items.")
+            if st.button("⏹ Cancel safety check"):
+                cancel_job(job["id"])
+            note = job_progress_note(job["id"])
+            if note:
+                st.caption(note)
+            partial = job_progress(job["id"])
+            if partial:
+                partial = render_safety_check(partial, partial=True)
+                st.markdown(f"""<pre style="white-space: pre-wrap; word-wrap: break-word;">{partial}</pre>""",
+                            unsafe_allow_html=True)
+            return
+        if status == UNKNOWN:
+            del st.session_state.rx_job
+            st.warning("The safety check was lost (server restart). Please run it again.")
+            return
+        try:
+            job["result"] = job_result(job["id"])
+        except CancelledError:
+            # cancelled before it started; a running check returns its partial answer
+            del st.session_state.rx_job
+            st.warning("Safety check cancelled.")
+            return
+    inference_result = render_safety_check(job["result"], config.result_footer)
+    local_html = ""
+    if job["interactions"]:
+        local_html = f"""<h3>Local Interaction Screening:</h3>
+        <pre style="white-space: pre-wrap; word-wrap: break-word;">{job['interactions']}</pre>"""
+    if job.get("receipt"):
+        local_html += f"""<h3>PoS Receipt:</h3>
+        <pre style="white-space: pre-wrap; word-wrap: break-word;">{job['receipt']}</pre>"""
+    html_content = f"""
+    <div style="font-family:Arial, sans-serif; padding:15px; border:1px solid #ccc; border-radius:8px; background-color:#f9f9f9; color:black;">
+        <h2>💊 RX Pro Inference</h2>
+        <p><strong>Customer:</strong> {username}</p>
+        <p><strong>Date:</strong> {date.today()}</p>
+        <p><strong>Model:</strong> {job['model']}</p>
+        <h3>RX Content:</h3>
+        <pre style="white-space: pre-wrap; word-wrap: break-word;">{job['rx_text']}</pre>
+        <h3>Instructions:</h3>
+        <pre style="white-space: pre-wrap; word-wrap: break-word;">{job['instructions']}</pre>
+        {local_html}
+        <h3>AI Inference Result:</h3>
+        <pre style="white-space: pre-wrap; word-wrap: break-word; color:black;">{inference_result}</pre>
+    </div>
+    """
+    st.markdown(html_content, unsafe_allow_html=True)
+    st.info("Use your browser's Print function (Ctrl+P or Cmd+P) to save as PDF.")
+
+# =====================================================
+# ADMIN DASHBOARD
+# =====================================================
+def admin_dashboard(config):
+    st.sidebar.success("Logged in as: Admin")
+    st.title("👨‍⚕️ Admin Dashboard - RX-Pro AI Pharmacy")
+
+    tab1, tab2, tab3 = st.tabs(["💊 Manage Drugs", "🧍 Customers", "📦 Orders"])
+    with tab1:
+        st.subheader("Drug Inventory")
+        drugs = drug_view_all_data()
+        if drugs:
+            df = pd.DataFrame(drugs, columns=["Name", "Expiry", "Usage", "Qty", "ID"])
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.info("No drugs in inventory.")
+        with st.expander("📥 Import Inventory CSV"):
+            drug_import_view("drug_import")
+        with st.expander("➕ Add New Drug"):
+            Dname = st.text_input("Drug Name")
+            Dexpdate = st.date_input("Expiry Date")
+            Duse = st.text_input("Usage / Purpose") if config.admin_drug_use else ""
+            Dqty = st.number_input("Quantity", min_value=1)
+            if st.button("Add Drug"):
+                if not Dname.strip():
+                    st.warning("Please provide a drug name.")
+                else:
+                    drug_add_data(Dname.strip(), str(Dexpdate), Duse, Dqty)
+                    st.success("Drug added successfully!")
+
+    with tab2:
+        st.subheader("Customer Records")
+        customers_view("customers")
+
+    with tab3:
+        st.subheader("All Orders")
+        if order_lines_view("all_orders", config.currency, total_label="Total Sales"):
+            st.markdown("#### Sales by Item")
+            report = item_sales_report()
+            st.dataframe(pd.DataFrame(report, columns=ITEM_REPORT_COLUMNS), use_container_width=True)
+
+# =====================================================
+# MAIN APP
+# =====================================================
+def run(config=None):
+    """Draw the app for ``config`` (a ``BranchConfig`` or a ``BRANCHES`` name)."""
+    if not hasattr(config, "currency"):
+        config = get_branch_config(config)
+    st.set_page_config(page_title=config.page_title, page_icon="💊", layout="wide")
+    init_db()
+
+    if "user_role" not in st.session_state:
+        st.session_state.user_role = None
+    if "username" not in st.session_state:
+        st.session_state.username = ""
+    if "cart" not in st.session_state:
+        st.session_state.cart = []
+
+    st.sidebar.title("Navigation")
+    menu = ["Login", "Sign Up", "Logout"]
+    choice = st.sidebar.selectbox("Menu", menu)
+
+    if st.session_state.user_role == "customer" and choice != "Logout":
+        customer_dashboard(config, st.session_state.username)
+        return
+    elif st.session_state.user_role == "admin" and choice != "Logout":
+        admin_dashboard(config)
+        return
+
+    if choice == "Login":
+        login_type = st.sidebar.radio("Login as:", ["Customer", "Admin"])
+        username = st.sidebar.text_input("Username")
+        password = st.sidebar.text_input("Password", type="password")
+
+        if st.sidebar.button("Login"):
+            if login_type == "Customer":
+                if customer_auth(username, password):
+                    st.session_state.user_role = "customer"
+                    st.session_state.username = username
+                    st.rerun()
+                else:
+                    st.error("Invalid credentials.")
+            else:
+                if username == "admin" and password == "admin":
+                    st.session_state.user_role = "admin"
+                    st.rerun()
+                else:
+                    st.error("Invalid admin credentials")
+
+    elif choice == "Sign Up":
+        st.subheader("Create a New Customer Account")
+        Cname = st.text_input("Full Name")
+        Cpass = st.text_input("Password", type="password")
+        Cpass2 = st.text_input("Confirm Password", type="password")
+        Cemail = st.text_input("Email ID")
+        Cstate = st.text_input("Branch")
+        Cnumber = st.text_input("Phone Number")
+        if st.button("Sign Up"):
+            if Cpass == Cpass2:
+                customer_add_data(Cname, Cpass, Cemail, Cstate, Cnumber)
+                st.success("Account created successfully! Please log in.")
+            else:
+                st.warning("Passwords do not match!")
+
+    elif choice == "Logout":
+        st.session_state.user_role = None
+        st.session_state.username = ""
+        st.session_state.cart = []
+        st.session_state.pop("rx_job", None)
+        st.sidebar.success("Logged out successfully.")
+        st.rerun()
@@ -0,0 +1,52 @@
+"""Storage backend selection for the dashboards.
+
+``RXPRO_BACKEND`` picks the module behind the dashboard data API:
+
+- ``sqlite`` (default): :mod:`rxpro.data` on the flat ``Drugs`` /
+  ``Orders`` / ``Customers`` tables.
+- ``relational``: :mod:`rxpro.relational` on the customer / seller /
+  product / inventory / orders schema in ``drugdatabase.sql``.
+
+Import the API from here (``from rxpro.backend import order_checkout``) and
+the call goes to the configured backend. Both modules implement every name
+in ``API`` with the same signatures and row shapes.
+"""
+import importlib
+import os
+import threading
+
+BACKENDS = {"sqlite": "rxpro.data", "relational": "rxpro.relational"}
+BACKEND = os.environ.get("RXPRO_BACKEND", "sqlite")
+
+API = [
+    "init_db",
+    "customer_add_data", "customer_auth", "customer_page", "customer_count",
+    "drug_add_data", "drug_next_id", "drug_catalog", "drug_search", "drug_view_all_data",
+    "order_checkout", "order_latest_data", "iter_orders", "iter_order_lines",
+    "orderline_page", "orderline_count", "item_sales_report",
+]
+
+
+class InsufficientStock(Exception):
+    """Raised by backends that refuse to sell more than a branch has in stock."""
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if BACKEND not in BACKENDS:
+                    raise ValueError(f"RXPRO_BACKEND must be one of {sorted(BACKENDS)}, not {BACKEND!r}")
+                _backend = importlib.import_module(BACKENDS[BACKEND])
+    return _backend
+
+
+def __getattr__(name):
+    if name in API:
+        return getattr(get_backend(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
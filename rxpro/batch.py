@@ -0,0 +1,194 @@
+"""Overnight batch RX safety screening.
+
+Re-screens a day's POS orders (or a folder of ``.txt`` RX files) with the same
+RX text the dashboard builds, through the inference cache, with bounded
+parallelism. Results go to the ``RxScreenings`` table keyed by run name, so an
+interrupted run picks up where it stopped when started again::
+
+    python -m rxpro.batch --date 2026-10-16
+    python -m rxpro.batch --dir ./rx_uploads --workers 8 --run uploads-oct
+
+``GEMINI_API_KEY`` must be set in the environment (or pass ``--api-key``).
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from rxpro import db
+from rxpro.data import init_db
+from rxpro.gemini import GEMINI_MODEL, INFERENCE_FAILED, coalescing_stats, run_gemini_inference
+from rxpro.inference_cache import get_cache
+from rxpro.jobs import INFERENCE_WORKERS
+from rxpro.orderlines import order_rx_text
+
+DEFAULT_INSTRUCTIONS = [
+    "Check dosage",
+    "Check drug interactions",
+    "Map to common allergies",
+]
+FETCH_CHUNK = 500
+
+
+# =====================================================
+# SOURCES
+# =====================================================
+def count_orders(day=None):
+    if day is None:
+        return db.fetchone('SELECT COUNT(*) FROM Orders')[0]
+    start, end = day.isoformat(), (day + timedelta(days=1)).isoformat()
+    return db.fetchone('SELECT COUNT(*) FROM Orders WHERE O_Date >= ? AND O_Date < ?', (start, end))[0]
+
+
+def iter_orders(day=None):
+    """Yield ``(source, customer, rx_text)`` for orders, streamed in chunks."""
+    sql = 'SELECT O_Name,O_Items,O_Qty,O_Prices,O_id FROM Orders'
+    params = ()
+    if day is not None:
+        sql += ' WHERE O_Date >= ? AND O_Date < ?'
+        params = (day.isoformat(), (day + timedelta(days=1)).isoformat())
+    with db.connection() as conn:
+        cur = conn.execute(sql + ' ORDER BY rowid', params)
+        while True:
+            rows = cur.fetchmany(FETCH_CHUNK)
+            if not rows:
+                return
+            for order in rows:
+                yield order[4], order[0], order_rx_text(order)
+
+
+def iter_rx_files(folder):
+    for path in sorted(Path(folder).glob("*.txt")):
+        yield path.name, None, path.read_text(encoding="utf-8")
+
+
+# =====================================================
+# RESULTS
+# =====================================================
+def completed_sources(run):
+    rows = db.fetchall("SELECT S_Source FROM RxScreenings WHERE S_Run=? AND S_Status='ok'", (run,))
+    return {row[0] for row in rows}
+
+
+def screening_add_data(run, source, customer, model, status, result, seconds):
+    db.execute('INSERT OR REPLACE INTO RxScreenings '
+               '(S_Run,S_Source,S_Customer,S_Model,S_Status,S_Result,S_Seconds,S_Date) '
+               'VALUES (?,?,?,?,?,?,?,?)',
+               (run, source, customer, model, status, result, seconds,
+                datetime.now().isoformat(sep=" ", timespec="seconds")))
+
+
+# =====================================================
+# RUNNER
+# =====================================================
+def _screen_one(run, source, customer, rx_text, instructions_text, api_key, model):
+    started = time.perf_counter()
+    result = run_gemini_inference(rx_text, instructions_text, api_key, model=model, customer=customer,
+                                  order_id=source if customer else None)
+    seconds = time.perf_counter() - started
+    status = "failed" if result.startswith(INFERENCE_FAILED) else "ok"
+    screening_add_data(run, source, customer, model, status, result, seconds)
+    return status
+
+
+def run_batch(sources, run, api_key, instructions=DEFAULT_INSTRUCTIONS, model=GEMINI_MODEL,
+              workers=INFERENCE_WORKERS, total=None, progress=print, progress_every=25):
+    """Screen every ``(source, customer, rx_text)`` not already done in ``run``.
+
+    At most ``workers`` checks are in flight, so sources are consumed lazily
+    and memory stays flat. Returns a summary dict.
+    """
+    instructions_text = "\n".join(instructions)
+    done = completed_sources(run)
+    summary = {"run": run, "ok": 0, "failed": 0, "skipped": 0}
+    cache_before = get_cache().stats()
+    coalesced_before = coalescing_stats()["coalesced"]
+    started = time.perf_counter()
+
+    def report():
+        finished = summary["ok"] + summary["failed"]
+        elapsed = time.perf_counter() - started
+        rate = finished / elapsed if elapsed else 0.0
+        of_total = f"/{total}" if total is not None else ""
+        progress(f"[{run}] {finished + summary['skipped']}{of_total} processed "
+                 f"({summary['ok']} ok, {summary['failed']} failed, {summary['skipped']} skipped) "
+                 f"{rate:.2f} RX/s")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rxpro-batch") as pool:
+        pending = set()
+
+        def drain(return_when):
+            nonlocal pending
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                summary[future.result()] += 1
+                if (summary["ok"] + summary["failed"]) % progress_every == 0:
+                    report()
+
+        for source, customer, rx_text in sources:
+            if source in done:
+                summary["skipped"] += 1
+                continue
+            if len(pending) >= workers:
+                drain(FIRST_COMPLETED)
+            pending.add(pool.submit(_screen_one, run, source, customer, rx_text,
+                                    instructions_text, api_key, model))
+        if pending:
+            drain(ALL_COMPLETED)
+
+    elapsed = time.perf_counter() - started
+    cache_after = get_cache().stats()
+    screened = summary["ok"] + summary["failed"]
+    summary.update(
+        seconds=elapsed,
+        per_second=screened / elapsed if elapsed else 0.0,
+        cache_hits=cache_after["hits"] - cache_before["hits"],
+        coalesced=coalescing_stats()["coalesced"] - coalesced_before,
+    )
+    report()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch RX safety screening.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--date", help="screen POS orders placed on this day (YYYY-MM-DD)")
+    source.add_argument("--all-orders", action="store_true", help="screen every POS order")
+    source.add_argument("--dir", help="screen every .txt RX file in this folder")
+    parser.add_argument("--run", help="run name used for resuming (default derived from the source)")
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS)
+    parser.add_argument("--model", default=GEMINI_MODEL)
+    parser.add_argument("--instruction", action="append", dest="instructions",
+                        help="inference instruction; repeatable (default: dosage, interactions, allergies)")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY", ""))
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("set GEMINI_API_KEY or pass --api-key")
+
+    init_db()
+    if args.dir:
+        files = sorted(Path(args.dir).glob("*.txt"))
+        sources, total = iter_rx_files(args.dir), len(files)
+        run = args.run or f"dir:{Path(args.dir).resolve()}"
+    elif args.all_orders:
+        sources, total = iter_orders(), count_orders()
+        run = args.run or f"orders:all:{date.today().isoformat()}"
+    else:
+        day = date.fromisoformat(args.date)
+        sources, total = iter_orders(day), count_orders(day)
+        run = args.run or f"orders:{day.isoformat()}"
+
+    summary = run_batch(sources, run, args.api_key, args.instructions or DEFAULT_INSTRUCTIONS,
+                        args.model, args.workers, total=total)
+    print(f"Screened {summary['ok'] + summary['failed']} RX in {summary['seconds']:.1f}s "
+          f"({summary['per_second']:.2f}/s), {summary['cache_hits']} from cache, "
+          f"{summary['coalesced']} shared with an identical check in flight, "
+          f"{summary['failed']} failed, {summary['skipped']} already done.")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Micro-benchmarks for the hot data paths.
+
+Usage::
+
+    python -m rxpro.benchmarks orders [--orders 100000]
+    python -m rxpro.benchmarks stock [--workers 8] [--orders 200]
+    python -m rxpro.benchmarks images [--width 4032] [--height 3024]
+    python -m rxpro.benchmarks prompt [--results 10000]
+"""
+import argparse
+import base64
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from rxpro.orderlines import ORDER_LINE_COLUMNS, expand_orders, order_totals, split_order_items
+
+
+def _expand_orders_loop(orders):
+    """The per-row ``split(",")`` loop the dashboards used before ``expand_orders``."""
+    lines = []
+    for O_Name, O_Items, O_Qty, O_Prices, O_id in orders:
+        for item, qty, price in split_order_items(O_Items, O_Qty, O_Prices):
+            lines.append([O_Name, item, qty, price, qty * price, O_id])
+    return lines, sum(line[4] for line in lines)
+
+
+def _expand_orders_explode(orders):
+    """``str.split`` + ``explode`` version of ``expand_orders``, for comparison.
+
+    Assumes well-formed rows (as many quantities and prices as items).
+    """
+    frame = pd.DataFrame(orders, columns=["Customer", "Item", "Qty", "Price", "Order ID"])
+    for col in ("Item", "Qty", "Price"):
+        frame[col] = frame[col].str.split(",")
+    lines = frame.explode(["Item", "Qty", "Price"], ignore_index=True)
+    lines["Qty"] = lines["Qty"].astype(int)
+    lines["Price"] = lines["Price"].astype(float)
+    lines["Subtotal"] = lines["Qty"] * lines["Price"]
+    lines = lines[ORDER_LINE_COLUMNS]
+    return lines, float(np.sum(lines["Subtotal"]))
+
+
+def synthetic_orders(n, max_items=8, seed=0):
+    rng = random.Random(seed)
+    drugs = [f"Drug{i}" for i in range(500)]
+    orders = []
+    for i in range(n):
+        k = rng.randint(1, max_items)
+        items = rng.sample(drugs, k)
+        qtys = [str(rng.randint(1, 10)) for _ in items]
+        prices = [f"{rng.uniform(1, 200):.2f}" for _ in items]
+        orders.append((f"Customer{i % 1000}", ",".join(items), ",".join(qtys), ",".join(prices), f"O{i}"))
+    return orders
+
+
+def bench_orders(n):
+    orders = synthetic_orders(n)
+    start = time.perf_counter()
+    loop_lines, loop_total = _expand_orders_loop(orders)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    explode_lines, explode_total = _expand_orders_explode(orders)
+    explode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lines = expand_orders(orders)
+    _, total = order_totals(lines)
+    vector_seconds = time.perf_counter() - start
+
+    for count, checked in ((len(explode_lines), explode_total), (len(lines), total)):
+        assert count == len(loop_lines) and abs(checked - loop_total) < 1e-6 * max(1.0, loop_total)
+    print(f"{n} orders, {len(lines)} lines")
+    print(f"  loop:          {loop_seconds:.3f}s")
+    print(f"  split/explode: {explode_seconds:.3f}s ({loop_seconds / explode_seconds:.1f}x)")
+    print(f"  vectorized:    {vector_seconds:.3f}s ({loop_seconds / vector_seconds:.1f}x)")
+    return loop_seconds, vector_seconds
+
+
+STOCK_PRODUCTS = 10
+STOCK_START = 150
+OTHER_SELLER = "OTHER"
+
+
+def _stock_worker(args):
+    worker, orders, seed = args
+    from rxpro import relational
+    from rxpro.backend import InsufficientStock
+
+    rng = random.Random(seed)
+    sold = refused = 0
+    for _ in range(orders):
+        cart = [{"Name": f"Stock{rng.randrange(STOCK_PRODUCTS)}", "Qty": rng.randint(1, 5), "Price": 1}
+                for _ in range(rng.randint(1, 3))]
+        try:
+            relational.order_checkout(f"worker{worker}", cart)
+            sold += 1
+        except InsufficientStock:
+            refused += 1
+    return sold, refused
+
+
+def stress_stock(workers, orders):
+    """Hammer one seller's stock from ``workers`` processes and check it balances.
+
+    Every product starts with ``STOCK_START`` units at this seller and at a
+    second seller. Afterwards each of this seller's inventory rows must equal
+    the start minus what its ``orders`` rows sold and never go negative, and
+    the other seller's stock must be untouched.
+    """
+    tmp = tempfile.mkdtemp(prefix="rxpro-stock-")
+    os.environ["RXPRO_RELATIONAL_DB_PATH"] = os.path.join(tmp, "relational.db")
+    os.environ["RXPRO_DB_PATH"] = os.path.join(tmp, "flat.db")
+    from rxpro import relational
+
+    relational.init_db()
+    with relational.get_pool().transaction() as conn:
+        conn.execute("INSERT INTO seller (sid, sname) VALUES (?, ?)", (OTHER_SELLER, OTHER_SELLER))
+        conn.executemany("INSERT INTO customer (uid) VALUES (?)", [(f"worker{i}",) for i in range(workers)])
+    for i in range(STOCK_PRODUCTS):
+        pid = relational.drug_add_data(f"Stock{i}", "2030-01-01", "", STOCK_START, Dprice=1)
+        with relational.get_pool().connection() as conn:
+            conn.execute("INSERT INTO inventory (pid, pname, quantity, sid) VALUES (?,?,?,?)",
+                         (pid, f"Stock{i}", STOCK_START, OTHER_SELLER))
+
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        results = pool.map(_stock_worker, [(i, orders, i) for i in range(workers)])
+    seconds = time.perf_counter() - start
+    sold = sum(r[0] for r in results)
+    refused = sum(r[1] for r in results)
+
+    with relational.get_pool().connection() as conn:
+        rows = conn.execute("""SELECT i.pname, i.sid, i.quantity,
+                                      (SELECT COALESCE(SUM(o.quantity), 0) FROM orders o
+                                       WHERE o.pid = i.pid AND o.sid = i.sid)
+                               FROM inventory i ORDER BY i.pname, i.sid""").fetchall()
+    bad = [r for r in rows if r[2] < 0 or r[2] != STOCK_START - r[3]
+           or (r[1] == OTHER_SELLER and r[2] != STOCK_START)]
+    print(f"{workers} workers x {orders} checkouts in {seconds:.2f}s: {sold} sold, {refused} refused for stock")
+    for name, sid, qty, ordered in bad:
+        print(f"  MISMATCH {name}@{sid}: {qty} on hand, {STOCK_START} - {ordered} expected")
+    print("stock consistent" if not bad else f"{len(bad)} inventory rows inconsistent")
+    return not bad
+
+
+def synthetic_photo(width, height, seed=0):
+    """A noisy phone-style JPEG, rotated by EXIF like a portrait shot."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 220, width, dtype=np.float32)[None, :, None]
+    pixels = np.clip(gradient + rng.normal(0, 18, (height, width, 3)), 0, 255).astype(np.uint8)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, "JPEG", quality=92, exif=exif)
+    return out.getvalue()
+
+
+def bench_images(width, height):
+    from rxpro.images import prepare_image
+
+    photo = synthetic_photo(width, height)
+    start = time.perf_counter()
+    image = prepare_image(photo)
+    seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    prepare_image(photo)
+    repeat_seconds = time.perf_counter() - start
+
+    def encoded(data):
+        return len(base64.b64encode(data)) / 1e6
+
+    print(f"{width}x{height} photo")
+    print(f"  upload: {len(photo) / 1e6:.2f} MB, {encoded(photo):.2f} MB base64")
+    print(f"  sent:   {len(image.data) / 1e6:.2f} MB, {encoded(image.data):.2f} MB base64 "
+          f"({len(photo) / len(image.data):.1f}x smaller)")
+    print(f"  prepare {seconds * 1000:.0f} ms, repeat {repeat_seconds * 1000:.2f} ms")
+    return len(photo), len(image.data)
+
+
+def _prompt_tokens(payload):
+    from rxpro.safety import estimate_tokens
+
+    return sum(estimate_tokens(part.get("text", "")) for content in payload["contents"]
+               for part in content["parts"])
+
+
+def bench_prompt(results):
+    """Prompt size of the free-text and compact prompts, and schema-result parse time."""
+    from rxpro.config import KAMPS_RESULT_FOOTER
+    from rxpro.gemini import build_payload
+    from rxpro.orderlines import order_rx_text
+    from rxpro.safety import parse_safety_check
+
+    order = synthetic_orders(1, max_items=4, seed=3)[0]
+    rx_text = order_rx_text(order)
+    instructions = "\n".join(["Check dosage", "Check drug interactions", "Map to common allergies"])
+    # before: the branch boilerplate went to the model with every check
+    free = build_payload(rx_text, "\n".join([instructions, *KAMPS_RESULT_FOOTER]), structured=False)
+    compact = build_payload(rx_text, instructions, structured=True)
+    print(f"prompt tokens (est.): free text {_prompt_tokens(free)}, compact {_prompt_tokens(compact)}")
+
+    items = order[1].split(",")
+    result = json.dumps({
+        "items": [{"item": item, "dose": "1 tab", "status": "ok", "note": ""} for item in items],
+        "interactions": [{"drug_a": items[0], "drug_b": items[-1], "severity": "minor", "note": "spacing"}],
+        "allergies": [], "substitutes": [], "counseling": ["Take with food."], "confidence": "high",
+    })
+    start = time.perf_counter()
+    for _ in range(results):
+        parse_safety_check(result)
+    seconds = time.perf_counter() - start
+    print(f"parsed {results} schema results ({len(result)} bytes each) in {seconds:.3f}s "
+          f"({seconds / results * 1e6:.1f} us each)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rxpro.benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    orders = sub.add_parser("orders", help="Expand legacy Orders rows into line items")
+    orders.add_argument("--orders", type=int, default=100000)
+    stock = sub.add_parser("stock", help="Concurrent checkouts against one seller's inventory")
+    stock.add_argument("--workers", type=int, default=8)
+    stock.add_argument("--orders", type=int, default=200, help="checkouts per worker")
+    images = sub.add_parser("images", help="Downscale and recompress a phone-sized RX photo")
+    images.add_argument("--width", type=int, default=4032)
+    images.add_argument("--height", type=int, default=3024)
+    prompt = sub.add_parser("prompt", help="Compact prompt size and structured-result parsing")
+    prompt.add_argument("--results", type=int, default=10000)
+    args = parser.parse_args(argv)
+    if args.command == "orders":
+        bench_orders(args.orders)
+    elif args.command == "stock":
+        return 0 if stress_stock(args.workers, args.orders) else 1
+    elif args.command == "images":
+        bench_images(args.width, args.height)
+    elif args.command == "prompt":
+        bench_prompt(args.results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Per-branch dashboard configuration.
+
+Every branch runs the same :mod:`rxpro.app` dashboards; what used to differ
+between app4.py, app5.py, app6.py and kamps.py is a ``BranchConfig``. The
+launcher scripts pick theirs by name, and ``app.py`` reads
+``RXPRO_APP_CONFIG`` (default ``rxpro``).
+"""
+import os
+from collections import namedtuple
+
+BranchConfig = namedtuple("BranchConfig", [
+    "page_title",
+    "currency",
+    "summary_qty_label",     # label for quantities in the sales-summary export
+    "pos_product_use",       # ask for usage when a new product is rung up
+    "admin_drug_use",        # ask for usage in the admin "Add New Drug" form
+    "default_use",           # usage stored for new products when none is given
+    "cart_drug_ids",         # reserve and show a drug id as items go into the cart
+    "receipt_header",        # checkout receipt header lines; None for no receipt
+    "receipt_thanks",
+    "rx_check_hint",         # remind the cashier to run the RX check after checkout
+    "rx_images",             # accept prescription images as well as .txt
+    "result_footer",         # lines shown under every safety-check result
+], defaults=[
+    "RX-Pro AI Pharmacy", "ZMW", "Qtys", False, True, "", False, None, "RXPro", True, False, (),
+])
+
+KAMPS_RESULT_FOOTER = (
+    "AI Transpency: PoS Simulation", "PoS ID:RXPr0-gem2.5AIv1.0.1", "Branch: Kamps Royal Pharmacy",
+    "All Prices(ZMW):VAT Inclusive", "Compliance: Required* Pharmacist_signature",
+    "Disclaimer: AI generated safety check",
+)
+
+BRANCHES = {
+    # app4.py
+    "rxpro": BranchConfig(currency="₹", summary_qty_label="Quantities", pos_product_use=True),
+    # app5.py
+    "kamps_pos": BranchConfig(
+        pos_product_use=True,
+        receipt_header=("KAMPS Royal Pharmacy Ltd",
+                        "Contact: +260 XXX XXX XXX | Email: contact@kampspharmacy.com",
+                        "========================================="),
+        receipt_thanks="KAMPS Royal Pharmacy Ltd",
+    ),
+    # app6.py
+    "kamps_ai": BranchConfig(
+        page_title="Kamps Royal Pharmacy", default_use="N/A", rx_check_hint=False, rx_images=True,
+        result_footer=KAMPS_RESULT_FOOTER,
+    ),
+    # kamps.py
+    "kamps": BranchConfig(
+        admin_drug_use=False, cart_drug_ids=True,
+        receipt_header=("KAMPS Royal Pharmacy Ltd",), receipt_thanks="KAMPS Royal Pharmacy Ltd",
+    ),
+}
+
+DEFAULT_BRANCH = "rxpro"
+
+
+def get_branch_config(name=None):
+    name = name or os.environ.get("RXPRO_APP_CONFIG", DEFAULT_BRANCH)
+    if name not in BRANCHES:
+        raise ValueError(f"unknown branch config {name!r}; expected one of {sorted(BRANCHES)}")
+    return BRANCHES[name]
@@ -0,0 +1,336 @@
+"""Data-access helpers used by the Streamlit apps.
+
+Every helper borrows a pooled connection from :mod:`rxpro.db` for the length
+of one call, so concurrent sessions never share a cursor.
+"""
+import threading
+from datetime import datetime
+
+from rxpro import db, ids, orderlines, schema, search
+
+_init_lock = threading.Lock()
+_initialized_path = None
+
+
+def init_db():
+    """Create and migrate the schema once per process (not on every rerun)."""
+    global _initialized_path
+    pool = db.get_pool()
+    if _initialized_path == pool.path:
+        return
+    with _init_lock:
+        if _initialized_path != pool.path:
+            with pool.connection() as conn:
+                schema.migrate(conn)
+            _initialized_path = pool.path
+
+
+# =====================================================
+# CUSTOMERS
+# =====================================================
+def customer_add_data(Cname, Cpass, Cemail, Cstate, Cnumber):
+    db.execute('INSERT INTO Customers (C_Name,C_Password,C_Email,C_State,C_Number) VALUES (?,?,?,?,?)',
+               (Cname, Cpass, Cemail, Cstate, Cnumber))
+
+
+def customer_view_all_data():
+    return db.fetchall('SELECT C_Name,C_Password,C_Email,C_State,C_Number FROM Customers')
+
+
+def customer_auth(username, password):
+    return db.fetchone('SELECT C_Name,C_Password,C_Email,C_State,C_Number FROM Customers '
+                       'WHERE C_Name=? AND C_Password=?', (username, password))
+
+
+# =====================================================
+# DRUG CATALOG CACHE
+# =====================================================
+# Every POS rerun needs the drug list. It is cached per process under the
+# CatalogVersion counter, which triggers bump on every write to Drugs from any
+# process (an import CLI, another terminal), so a cache hit costs one
+# primary-key read. The version is read before the rows, so a racing write can
+# only leave rows newer than their version, which the next read replaces.
+_drug_cache = {"version": None}
+_drug_cache_lock = threading.Lock()
+
+
+def invalidate_drug_cache():
+    with _drug_cache_lock:
+        _drug_cache.clear()
+        _drug_cache["version"] = None
+
+
+def _cached_drugs(name, sql):
+    version = db.fetchone("SELECT CV_Version FROM CatalogVersion WHERE CV_id = 1")[0]
+    with _drug_cache_lock:
+        if _drug_cache["version"] != version:
+            _drug_cache.clear()
+            _drug_cache["version"] = version
+        elif name in _drug_cache:
+            return _drug_cache[name]
+    rows = db.fetchall(sql)
+    with _drug_cache_lock:
+        if _drug_cache["version"] == version:
+            _drug_cache[name] = rows
+    return rows
+
+
+# =====================================================
+# DRUGS
+# =====================================================
+def drug_add_data(Dname, Dexpdate, Duse, Dqty, Did=None, Dprice=0):
+    """Add a drug and return its id; ``Did=None`` takes the next id from the drug sequence.
+
+    D_Name is unique, so adding a name that is already stocked adds ``Dqty``
+    to it and updates its expiry (and usage / price when given), the way the
+    lookup-index migration merged duplicate rows.
+    """
+    with db.transaction() as conn:
+        row = conn.execute('SELECT D_id FROM Drugs WHERE D_Name=?', (Dname,)).fetchone()
+        if row is not None:
+            Did = row[0]
+            conn.execute('''UPDATE Drugs SET D_Qty = D_Qty + ?, D_ExpDate = ?,
+                            D_Use = CASE WHEN ? <> '' THEN ? ELSE D_Use END,
+                            D_Price = CASE WHEN ? > 0 THEN ? ELSE D_Price END
+                            WHERE D_id = ?''', (Dqty, Dexpdate, Duse, Duse, Dprice, Dprice, Did))
+        else:
+            if Did is None:
+                Did = ids.next_drug_ids(conn)[0]
+            conn.execute('INSERT INTO Drugs (D_Name, D_ExpDate, D_Use, D_Qty, D_id, D_Price) VALUES (?,?,?,?,?,?)',
+                         (Dname, Dexpdate, Duse, Dqty, Did, Dprice))
+    invalidate_drug_cache()
+    return Did
+
+
+def drug_next_id():
+    """Reserve a drug id before the drug is saved (the POS shows it in the cart)."""
+    with db.transaction() as conn:
+        return ids.next_drug_ids(conn)[0]
+
+
+def drug_catalog():
+    """``(D_Name, D_id, D_Price)`` for the POS product picker, cached."""
+    return _cached_drugs("catalog", 'SELECT D_Name, D_id, D_Price FROM Drugs ORDER BY D_Name')
+
+
+def drug_search(query, limit=search.SEARCH_LIMIT):
+    """POS typeahead: the cached catalog for an empty query, else the FTS index."""
+    if not (query or "").strip():
+        return drug_catalog()[:limit]
+    return search.drug_search(query, limit)
+
+
+def drug_view_all_data():
+    return _cached_drugs("inventory", 'SELECT D_Name,D_ExpDate,D_Use,D_Qty,D_id FROM Drugs')
+
+
+def drug_view_data(Dname):
+    return db.fetchone('SELECT D_Name,D_ExpDate,D_Use,D_Qty,D_id FROM Drugs WHERE D_Name=?', (Dname,))
+
+
+def drug_update_quantity(Dname, Dqty):
+    db.execute('UPDATE Drugs SET D_Qty=? WHERE D_Name=?', (Dqty, Dname))
+    invalidate_drug_cache()
+
+
+def drug_delete(Did):
+    db.execute('DELETE FROM Drugs WHERE D_id=?', (Did,))
+    invalidate_drug_cache()
+
+
+# =====================================================
+# ORDERS
+# =====================================================
+def order_timestamp():
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def order_add_data(O_Name, O_Items, O_Qty, O_Prices, O_id):
+    with db.transaction() as conn:
+        conn.execute('INSERT INTO Orders (O_Name,O_Items,O_Qty,O_Prices,O_id,O_Date) VALUES (?,?,?,?,?,?)',
+                     (O_Name, O_Items, O_Qty, O_Prices, O_id, order_timestamp()))
+        orderlines.orderline_add_data(conn, O_id, orderlines.split_order_items(O_Items, O_Qty, O_Prices))
+
+
+def order_view_data(customername):
+    return db.fetchall('SELECT O_Name,O_Items,O_Qty,O_Prices,O_id FROM Orders WHERE O_Name=?',
+                       (customername,))
+
+
+def order_latest_data(customername):
+    return db.fetchone('SELECT O_Name,O_Items,O_Qty,O_Prices,O_id FROM Orders WHERE O_Name=? '
+                       'ORDER BY rowid DESC LIMIT 1', (customername,))
+
+
+def order_view_all_data():
+    return db.fetchall('SELECT O_Name,O_Items,O_Qty,O_Prices,O_id FROM Orders')
+
+
+# =====================================================
+# PAGINATED VIEWS
+# =====================================================
+# Keyset pagination: each page continues strictly after the last row of the
+# previous one (newest first), so page N costs the same as page 1.
+def _orderline_filters(customer=None, item=None, date_from=None, date_to=None):
+    where, params = [], []
+    if customer:
+        where.append("o.O_Name = ?")
+        params.append(customer)
+    if item:
+        where.append("l.OL_Name = ? COLLATE NOCASE")
+        params.append(item)
+    if date_from:
+        where.append("o.O_Date >= ?")
+        params.append(str(date_from))
+    if date_to:
+        # Inclusive of the whole end day.
+        where.append("o.O_Date < ?")
+        params.append(str(date_to) + "\uffff")
+    return where, params
+
+
+def orderline_page(after=None, page_size=50, **filters):
+    """One page of order lines, newest first; the last column is the keyset cursor."""
+    where, params = _orderline_filters(**filters)
+    if after is not None:
+        where.append("l.OL_id < ?")
+        params.append(after)
+    sql = ('SELECT o.O_Name, l.OL_Name, l.OL_Qty, l.OL_Price, l.OL_Qty * l.OL_Price, l.O_id, o.O_Date, l.OL_id '
+           'FROM OrderLines l JOIN Orders o ON o.O_id = l.O_id')
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return db.fetchall(sql + " ORDER BY l.OL_id DESC LIMIT ?", params + [page_size])
+
+
+def orderline_count(**filters):
+    """``(line count, sales total)`` over every line matching the filters."""
+    where, params = _orderline_filters(**filters)
+    sql = ('SELECT COUNT(*), COALESCE(SUM(l.OL_Qty * l.OL_Price), 0) '
+           'FROM OrderLines l JOIN Orders o ON o.O_id = l.O_id')
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return db.fetchone(sql, params)
+
+
+def _customer_filters(name=None, branch=None):
+    where, params = [], []
+    if name:
+        where.append("C_Name >= ? AND C_Name < ?")
+        params += [name, name + "\uffff"]
+    if branch:
+        where.append("C_State = ?")
+        params.append(branch)
+    return where, params
+
+
+def customer_page(after=None, page_size=50, **filters):
+    """One page of customers in sign-up order; the last column is the keyset cursor."""
+    where, params = _customer_filters(**filters)
+    if after is not None:
+        where.append("rowid > ?")
+        params.append(after)
+    sql = 'SELECT C_Name,C_Password,C_Email,C_State,C_Number,rowid FROM Customers'
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return db.fetchall(sql + " ORDER BY rowid LIMIT ?", params + [page_size])
+
+
+def customer_count(**filters):
+    where, params = _customer_filters(**filters)
+    sql = 'SELECT COUNT(*) FROM Customers'
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return db.fetchone(sql, params)[0]
+
+
+def _stream(sql, params, chunk):
+    with db.connection() as conn:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                return
+            yield from rows
+
+
+def iter_orders(customername, chunk=500):
+    """``(O_Name, O_Items, O_Qty, O_Prices, O_id)`` rows, oldest first, read ``chunk`` at a time."""
+    return _stream('SELECT O_Name,O_Items,O_Qty,O_Prices,O_id FROM Orders WHERE O_Name=? ORDER BY rowid',
+                   (customername,), chunk)
+
+
+def iter_order_lines(customername, chunk=500):
+    """``ORDER_LINE_COLUMNS`` + Date rows, oldest first, read ``chunk`` at a time."""
+    return _stream('''SELECT o.O_Name, l.OL_Name, l.OL_Qty, l.OL_Price, l.OL_Qty * l.OL_Price, l.O_id, o.O_Date
+                      FROM OrderLines l JOIN Orders o ON o.O_id = l.O_id
+                      WHERE o.O_Name=? ORDER BY l.OL_id''', (customername,), chunk)
+
+
+def orderline_view_data(customername):
+    with db.connection() as conn:
+        return orderlines.orderline_view_data(conn, customername)
+
+
+def orderline_view_all_data():
+    with db.connection() as conn:
+        return orderlines.orderline_view_all_data(conn)
+
+
+def order_total(customername=None):
+    with db.connection() as conn:
+        return orderlines.order_total(conn, customername)
+
+
+def item_sales_report():
+    with db.connection() as conn:
+        return orderlines.item_sales_report(conn)
+
+
+# =====================================================
+# CHECKOUT
+# =====================================================
+NEW_DRUG_EXPDATE = "2026-12-31"
+# Shared with rxpro.queryplan so the plan check covers the statements run here.
+CHECKOUT_DECREMENT = 'UPDATE Drugs SET D_Qty = MAX(0, D_Qty - ?) WHERE D_Name = ?'
+CHECKOUT_KNOWN_DRUGS = 'SELECT D_Name FROM Drugs WHERE D_Name IN ({placeholders})'
+
+
+def order_checkout(O_Name, cart, default_use="N/A"):
+    """Record a sale and decrement stock in a single transaction.
+
+    ``cart`` is the POS cart: dicts with ``Name``, ``Qty`` and ``Price`` and
+    optionally ``Use`` and ``ID`` for products not yet in ``Drugs`` (they are
+    added with the sold quantity, as the POS always has). Returns the order id.
+    """
+    names = [str(item["Name"]) for item in cart]
+    qtys = [int(item["Qty"]) for item in cart]
+    prices = [item["Price"] for item in cart]
+
+    # One stock row per product, even when the cart lists it twice.
+    stock = {}
+    for item, name, qty in zip(cart, names, qtys):
+        if name in stock:
+            stock[name]["Qty"] += qty
+        else:
+            stock[name] = {"Qty": qty, "Use": item.get("Use") or default_use, "ID": item.get("ID"),
+                           "Price": item["Price"]}
+
+    with db.transaction() as conn:
+        O_id = ids.next_order_ids(conn)[0]
+        conn.executemany(CHECKOUT_DECREMENT, [(s["Qty"], name) for name, s in stock.items()])
+        placeholders = ",".join("?" * len(stock)) or "NULL"
+        known = {row[0] for row in conn.execute(CHECKOUT_KNOWN_DRUGS.format(placeholders=placeholders),
+                                                list(stock))}
+        new = [name for name in stock if name not in known]
+        unnumbered = [name for name in new if stock[name]["ID"] is None]
+        for name, Did in zip(unnumbered, ids.next_drug_ids(conn, len(unnumbered))):
+            stock[name]["ID"] = Did
+        conn.executemany('INSERT INTO Drugs (D_Name, D_ExpDate, D_Use, D_Qty, D_id, D_Price) VALUES (?,?,?,?,?,?)',
+                         [(name, NEW_DRUG_EXPDATE, stock[name]["Use"], stock[name]["Qty"], stock[name]["ID"],
+                           stock[name]["Price"]) for name in new])
+        conn.execute('INSERT INTO Orders (O_Name,O_Items,O_Qty,O_Prices,O_id,O_Date) VALUES (?,?,?,?,?,?)',
+                     (O_Name, ",".join(names), ",".join(map(str, qtys)), ",".join(map(str, prices)), O_id,
+                      order_timestamp()))
+        orderlines.orderline_add_data(conn, O_id, list(zip(names, qtys, prices)))
+    invalidate_drug_cache()
+    return O_id
@@ -0,0 +1,153 @@
+"""Bounded SQLite connection pool shared by every Streamlit session.
+
+Connections run in WAL mode so readers on different terminals never block each
+other, and each call gets its own short-lived cursor instead of sharing one
+module-level ``c``. Nothing touches the database until the first query.
+
+Settings come from the environment:
+
+- ``RXPRO_DB_PATH`` (default ``drug_data.db``)
+- ``RXPRO_DB_POOL_SIZE`` (default 8)
+- ``RXPRO_DB_BUSY_TIMEOUT_MS`` (default 5000)
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get("RXPRO_DB_PATH", "drug_data.db")
+POOL_SIZE = int(os.environ.get("RXPRO_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = int(os.environ.get("RXPRO_DB_BUSY_TIMEOUT_MS", "5000"))
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within the acquire timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, path=DB_PATH, size=POOL_SIZE, busy_timeout_ms=BUSY_TIMEOUT_MS,
+                 acquire_timeout=30.0, pragmas=()):
+        self.path = path
+        self.pragmas = list(pragmas)
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Autocommit mode: transactions are opened explicitly in transaction().
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise PoolTimeout(f"no free connection to {self.path} after {self.acquire_timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for reads or single autocommit writes."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection inside ``BEGIN IMMEDIATE`` ... ``COMMIT``.
+
+        IMMEDIATE takes the write lock up front, so concurrent writers wait on
+        the busy timeout instead of failing on a read-to-write lock upgrade.
+        """
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+
+
+# =====================================================
+# DEFAULT POOL
+# =====================================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def configure(path=None, size=None, busy_timeout_ms=None):
+    """Replace the default pool, e.g. to point a branch or a benchmark at another file."""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(
+            path=path or DB_PATH,
+            size=size or POOL_SIZE,
+            busy_timeout_ms=busy_timeout_ms or BUSY_TIMEOUT_MS)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def connection():
+    return get_pool().connection()
+
+
+def transaction():
+    return get_pool().transaction()
+
+
+def fetchall(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def fetchone(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def execute(sql, params=()):
+    with connection() as conn:
+        return conn.execute(sql, params).rowcount
@@ -0,0 +1,82 @@
+"""Sales-summary exports (TXT, CSV and PDF).
+
+Rows are streamed from the storage backend in ``EXPORT_CHUNK`` batches and
+the text formats are encoded chunk by chunk into one buffer. Exports are only
+built when the download button is clicked; Streamlit needs the finished file
+as bytes, so there is nothing to gain from spooling it to disk.
+"""
+import csv
+import io
+import os
+from datetime import date
+
+from rxpro import backend
+from rxpro.orderlines import ORDER_LINE_COLUMNS
+
+EXPORT_CHUNK = int(os.environ.get("RXPRO_EXPORT_CHUNK", "500"))
+EXPORT_FORMATS = {
+    "TXT": ("txt", "text/plain"),
+    "CSV": ("csv", "text/csv"),
+    "PDF": ("pdf", "application/pdf"),
+}
+SUMMARY_FOOTER = "Thank you for choosing RXPro!\nReliable Patient Safety PoS 💚"
+
+
+# =====================================================
+# FORMATS
+# =====================================================
+def sales_summary_txt(customername, qty_label="Qtys"):
+    yield f"==== RxPro AI Pharmacy ====\nCustomer: {customername}\n\n"
+    for order in backend.iter_orders(customername, EXPORT_CHUNK):
+        yield (f"Order ID: {order[4]}\nItems: {order[1]}\n{qty_label}: {order[2]}\n"
+               f"Prices: {order[3]}\n{'-'*30}\n")
+    yield f"\nDate: {date.today()}\n{SUMMARY_FOOTER}"
+
+
+def sales_summary_csv(customername):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ORDER_LINE_COLUMNS + ["Date"])
+    for i, row in enumerate(backend.iter_order_lines(customername, EXPORT_CHUNK), 1):
+        writer.writerow(row)
+        if i % EXPORT_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def sales_summary_pdf(customername, qty_label="Qtys"):
+    """PDF bytes for the TXT summary.
+
+    FPDF lays the whole document out in memory before writing it, so only the
+    database side of a PDF export is streamed.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=10)
+    for block in sales_summary_txt(customername, qty_label):
+        # the core PDF fonts are latin-1 only
+        pdf.multi_cell(0, 5, block.encode("latin-1", "replace").decode("latin-1"))
+    out = pdf.output(dest="S")
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+
+def encode_chunks(chunks):
+    """UTF-8 bytes of text ``chunks``."""
+    out = io.BytesIO()
+    for chunk in chunks:
+        out.write(chunk.encode("utf-8"))
+    return out.getvalue()
+
+
+def export_sales_summary(customername, fmt="TXT", qty_label="Qtys"):
+    """``customername``'s orders as bytes in one of ``EXPORT_FORMATS``."""
+    if fmt == "PDF":
+        return sales_summary_pdf(customername, qty_label)
+    if fmt == "CSV":
+        return encode_chunks(sales_summary_csv(customername))
+    return encode_chunks(sales_summary_txt(customername, qty_label))
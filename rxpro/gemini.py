@@ -0,0 +1,498 @@
+"""Gemini RX safety-check client.
+
+:class:`GeminiClient` keeps one pooled ``requests.Session`` per process so
+calls reuse keep-alive connections, applies connect/read timeouts, retries
+429/5xx and connection errors with jittered exponential backoff, and trips a
+circuit breaker after repeated upstream failures so checks fail fast while the
+API is down.
+
+:func:`run_gemini_inference` sends each check to the model tier picked by
+:mod:`rxpro.routing` (unless a model is named) with the compact prompt and
+JSON response schema from :mod:`rxpro.safety` (``RXPRO_GEMINI_STRUCTURED``).
+It reads ``streamGenerateContent`` as server-sent events so the answer shows
+up as it is generated (``RXPRO_GEMINI_STREAM``), and identical checks in
+flight at the same time (same inference-cache key) share one upstream call
+through :class:`SingleFlight`. Both settings are on by default.
+
+Point ``RXPRO_GEMINI_BASE_URL`` at a local stub server
+(``python -m rxpro.gemini_stub``) to try it without an API key.
+"""
+import base64
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+from rxpro.images import image_digest, prepare_image
+from rxpro.inference_cache import get_cache, make_key
+from rxpro.jobs import INFERENCE_WORKERS
+from rxpro.memory import get_memory
+from rxpro.routing import (
+    CONFIDENCE_INSTRUCTION, ESCALATE_ON, ESCALATED_NOTE, FAST, GEMINI_MODEL, PRO,
+    count_rx_items, get_budget, route_rx_check, split_confidence,
+)
+from rxpro.safety import (
+    GENERATION_CONFIG, INFERENCE_CANCELLED, NO_INSTRUCTIONS, SCHEMA_VERSION, build_prompt,
+)
+
+GEMINI_BASE_URL = os.environ.get("RXPRO_GEMINI_BASE_URL",
+                                 "https://generativelanguage.googleapis.com/v1beta")
+CONNECT_TIMEOUT = float(os.environ.get("RXPRO_GEMINI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("RXPRO_GEMINI_READ_TIMEOUT", "120"))
+MAX_RETRIES = int(os.environ.get("RXPRO_GEMINI_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("RXPRO_GEMINI_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("RXPRO_GEMINI_BACKOFF_MAX", "8"))
+BREAKER_THRESHOLD = int(os.environ.get("RXPRO_GEMINI_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.environ.get("RXPRO_GEMINI_BREAKER_COOLDOWN", "30"))
+STREAM = os.environ.get("RXPRO_GEMINI_STREAM", "1") not in ("0", "false", "no")
+STRUCTURED = os.environ.get("RXPRO_GEMINI_STRUCTURED", "1") not in ("0", "false", "no")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+INFERENCE_FAILED = "AI Inference failed: "
+FOLLOW_POLL_SECONDS = 0.1
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+# =====================================================
+# CIRCUIT BREAKER
+# =====================================================
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures; after ``cooldown``
+    seconds a single trial call is let through (half-open). A trial that ends
+    in neither a success nor a failure is released by :meth:`end_call`."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial = None  # thread running the half-open trial call
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial is not None:
+                return False
+            self._trial = threading.get_ident()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = None
+
+    def end_call(self):
+        with self._lock:
+            if self._trial == threading.get_ident():
+                self._trial = None
+
+
+# =====================================================
+# SINGLE-FLIGHT
+# =====================================================
+class _Flight:
+    def __init__(self, progress):
+        self.done = threading.Event()
+        self.progress = progress
+        self.text = None
+        self.complete = False
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers for the key share its result.
+
+    ``stats()`` counts ``upstream_calls`` made and ``coalesced`` calls saved.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"upstream_calls": 0, "coalesced": 0}
+
+    def run(self, key, fn, progress=None):
+        """Return ``fn()``'s ``(text, complete)``, or the in-flight call's for ``key``.
+
+        A follower copies the leader's streamed text into its own ``progress``
+        and may cancel its wait without affecting the leader. If the leader is
+        cancelled, its followers start over; if it raises, they raise too.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight(progress)
+                    self._stats["upstream_calls"] += 1
+            if leader:
+                return self._lead(key, flight, fn)
+            result = self._follow(flight, progress)
+            if result is not None:
+                return result
+
+    def _lead(self, key, flight, fn):
+        try:
+            flight.text, flight.complete = fn()
+            return flight.text, flight.complete
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    @staticmethod
+    def _copy(source, progress, synced):
+        """Copy ``source``'s new output into ``progress``; returns the new ``synced`` state."""
+        restarts, text, note = source.snapshot()
+        copied = synced[1]
+        if restarts != synced[0]:
+            progress.restart(note)
+            copied = 0
+        progress.append(text[copied:])
+        return restarts, len(text)
+
+    def _follow(self, flight, progress):
+        synced = (0, 0)  # (leader restarts seen, characters copied since)
+        while not flight.done.wait(FOLLOW_POLL_SECONDS):
+            if progress is None:
+                continue
+            if progress.cancelled:
+                return progress.text, False
+            if flight.progress is not None:
+                synced = self._copy(flight.progress, progress, synced)
+        if flight.error is not None:
+            raise flight.error
+        if not flight.complete:
+            return None
+        with self._lock:
+            self._stats["coalesced"] += 1
+        if progress is not None:
+            if flight.progress is not None:
+                self._copy(flight.progress, progress, synced)
+            else:
+                progress.append(flight.text)
+        return flight.text, True
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+_flights = SingleFlight()
+
+
+def coalescing_stats():
+    return _flights.stats()
+
+
+# =====================================================
+# CLIENT
+# =====================================================
+def _image_part(image_bytes, mime_type):
+    img_b64 = base64.b64encode(image_bytes).decode("utf-8")
+    return {"inline_data": {"mime_type": mime_type, "data": img_b64}}
+
+
+def build_payload(rx_text, instructions, image_bytes=None, mime_type="image/jpeg", structured=None):
+    """Request body for a check; ``structured`` (default ``STRUCTURED``) asks for schema JSON."""
+    if STRUCTURED if structured is None else structured:
+        parts = [{"text": build_prompt(rx_text, instructions)}]
+        if image_bytes:
+            parts.append(_image_part(image_bytes, mime_type))
+        return {"contents": [{"role": "user", "parts": parts}], "generationConfig": GENERATION_CONFIG}
+    contents = [
+        {"parts": [{"text": f"RX Content:\n{rx_text}"}]},
+        {"parts": [{"text": f"Instructions:\n{instructions or NO_INSTRUCTIONS}"}]}
+    ]
+    if image_bytes:
+        contents.append({"parts": [_image_part(image_bytes, mime_type)]})
+    return {"contents": contents}
+
+
+class GeminiClient:
+    def __init__(self, base_url=GEMINI_BASE_URL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, breaker=None, pool_size=INFERENCE_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def post(self, path, payload, api_key, stream=False, read_timeout=None, max_retries=None):
+        """POST JSON to ``base_url/path`` with retries; returns the response.
+
+        With ``stream`` only the status and headers are read, so retries stop
+        at the first response that starts a body. ``read_timeout`` and
+        ``max_retries`` override the client's for this call.
+        """
+        timeout = (self.timeout[0], read_timeout) if read_timeout else self.timeout
+        max_retries = self.max_retries if max_retries is None else max_retries
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini API unavailable; retrying after cooldown")
+        headers = {
+            "x-goog-api-key": api_key,
+            "Content-Type": "application/json"
+        }
+        url = f"{self.base_url}/{path}"
+        try:
+            for attempt in range(max_retries + 1):
+                resp = None
+                try:
+                    resp = self.session.post(url, json=payload, headers=headers, timeout=timeout,
+                                             stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                else:
+                    if resp.status_code not in RETRY_STATUSES:
+                        # 4xx other than 429 is our request's fault, not an upstream outage.
+                        self.breaker.record_success()
+                        resp.raise_for_status()
+                        return resp
+                    error = requests.HTTPError(f"{resp.status_code} Server Error for url: {url}",
+                                               response=resp)
+                    resp.close()
+                if attempt < max_retries:
+                    time.sleep(self._backoff(attempt, resp))
+            self.breaker.record_failure()
+            raise error
+        finally:
+            # e.g. InvalidURL: neither outcome was recorded, so free the half-open trial
+            self.breaker.end_call()
+
+    def generate_content(self, rx_text, instructions, api_key, image_bytes=None,
+                         mime_type="image/jpeg", model=GEMINI_MODEL, read_timeout=None, max_retries=None):
+        """Call ``generateContent`` and return the response text; raises on failure."""
+        payload = build_payload(rx_text, instructions, image_bytes, mime_type)
+        data = self.post(f"models/{model}:generateContent", payload, api_key,
+                         read_timeout=read_timeout, max_retries=max_retries).json()
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+
+    def stream_content(self, rx_text, instructions, api_key, image_bytes=None,
+                       mime_type="image/jpeg", model=GEMINI_MODEL, cancelled=None, read_timeout=None,
+                       max_retries=None):
+        """Yield the response text in chunks from ``streamGenerateContent``.
+
+        ``cancelled`` is polled between chunks; when it returns true the
+        connection is closed and the generator stops. A read timeout between
+        chunks raises ``requests.ReadTimeout``, as one before the headers does.
+        """
+        payload = build_payload(rx_text, instructions, image_bytes, mime_type)
+        resp = self.post(f"models/{model}:streamGenerateContent?alt=sse", payload, api_key, stream=True,
+                         read_timeout=read_timeout, max_retries=max_retries)
+        with resp:
+            try:
+                for line in resp.iter_lines(decode_unicode=True):
+                    if cancelled is not None and cancelled():
+                        return
+                    if not line or not line.startswith("data:"):
+                        continue
+                    for candidate in json.loads(line[5:]).get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+            except requests.ConnectionError as e:
+                # requests wraps a mid-body read timeout in a ConnectionError
+                if e.args and isinstance(e.args[0], ReadTimeoutError):
+                    raise requests.ReadTimeout(*e.args, request=e.request, response=resp) from e
+                raise
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeminiClient()
+    return _client
+
+
+def generate_content(rx_text, instructions, api_key, image_bytes=None, mime_type="image/jpeg",
+                     model=GEMINI_MODEL, read_timeout=None, max_retries=None):
+    return get_client().generate_content(rx_text, instructions, api_key, image_bytes, mime_type, model,
+                                         read_timeout, max_retries)
+
+
+def stream_content(rx_text, instructions, api_key, image_bytes=None, mime_type="image/jpeg",
+                   model=GEMINI_MODEL, cancelled=None, read_timeout=None, max_retries=None):
+    return get_client().stream_content(rx_text, instructions, api_key, image_bytes, mime_type, model,
+                                       cancelled, read_timeout, max_retries)
+
+
+# =====================================================
+# RX SAFETY CHECK
+# =====================================================
+def read_image(image_file):
+    """Return ``(bytes, mime_type)`` for a Streamlit upload (or any file object)."""
+    if image_file is None:
+        return None, None
+    image_bytes = image_file.getvalue() if hasattr(image_file, "getvalue") else image_file.read()
+    return image_bytes, getattr(image_file, "type", None) or "image/jpeg"
+
+
+def _call_model(rx_text, instructions, api_key, image_bytes, mime_type, model, read_timeout=None,
+                progress=None, max_retries=None):
+    """One upstream call, streamed into ``progress`` if given; returns ``(text, complete)``."""
+    if progress is None or not STREAM:
+        return generate_content(rx_text, instructions, api_key, image_bytes, mime_type, model,
+                                read_timeout, max_retries), True
+    parts = []
+    for chunk in stream_content(rx_text, instructions, api_key, image_bytes, mime_type, model,
+                                cancelled=lambda: progress.cancelled, read_timeout=read_timeout,
+                                max_retries=max_retries):
+        parts.append(chunk)
+        progress.append(chunk)
+    return "".join(parts), not progress.cancelled
+
+
+def _routed_call(rx_text, instructions, api_key, image_bytes, mime_type, route, progress=None):
+    """Run the check on ``route``'s tier, escalating to Pro; returns ``(text, complete, cacheable)``.
+
+    Answers that are not what the route would normally give (kept on the fast
+    tier because the Pro budget is spent) are not cacheable.
+    """
+    budget = get_budget()
+    tier = route.tier
+    if tier is PRO and not budget.take():
+        tier = FAST
+    if tier is PRO:
+        text, complete = _call_model(rx_text, instructions, api_key, image_bytes, mime_type,
+                                     PRO.model, PRO.read_timeout, progress)
+        return text, complete, True
+
+    try:
+        # the JSON schema has its own confidence field
+        fast_instructions = instructions if STRUCTURED else f"{instructions}\n{CONFIDENCE_INSTRUCTION}".lstrip()
+        text, complete = _call_model(rx_text, fast_instructions, api_key, image_bytes, mime_type,
+                                     FAST.model, FAST.read_timeout, progress, FAST.max_retries)
+    except requests.Timeout:
+        if route.tier is not FAST or not budget.take():
+            raise
+        reason = "fast model timed out"
+    else:
+        if not complete:
+            return text, False, False
+        text, confidence = split_confidence(text)
+        if confidence not in ESCALATE_ON:
+            return text, True, route.tier is FAST
+        if route.tier is not FAST or not budget.take():
+            return text, True, False
+        reason = f"fast model reported {confidence.lower()} confidence"
+    note = ESCALATED_NOTE.format(model=PRO.model, reason=reason)
+    if progress is not None:
+        # the fast answer so far is abandoned; the panel shows only Pro's from here
+        progress.restart(note.strip())
+    text, complete = _call_model(rx_text, instructions, api_key, image_bytes, mime_type,
+                                 PRO.model, PRO.read_timeout, progress)
+    return note + text, complete, True
+
+
+def run_gemini_inference(rx_text, instructions, api_key, image_file=None, model=None,
+                         use_cache=True, customer=None, order_id=None, progress=None, route=None):
+    """Run the RX safety check, answering repeats from the inference cache.
+
+    Without a ``model`` the check goes to ``route`` (a
+    :class:`rxpro.routing.Route`), or to the tier :func:`route_rx_check` picks
+    from the RX text, instructions and image.
+
+    Images are looked up by the digest of the uploaded bytes and only
+    downscaled and recompressed (:func:`rxpro.images.prepare_image`) on a
+    cache miss. Successful results are remembered in the ADE memory under
+    ``customer`` and ``order_id``. Failures are returned as an
+    ``"AI Inference failed: ..."`` message and are neither cached nor remembered.
+
+    Given a :class:`rxpro.jobs.JobProgress` (and ``STREAM`` on), the answer is
+    streamed into it as it arrives; a cancelled check returns the partial text
+    with ``INFERENCE_CANCELLED`` appended and is not cached either. A check
+    identical to one already in flight waits for that call instead of making
+    its own.
+    """
+    image_bytes, mime_type = read_image(image_file)
+    if model is None:
+        route = route or route_rx_check(count_rx_items(rx_text), instructions, image_bytes is not None)
+        model = route.tier.model
+    else:
+        route = None
+    cache = get_cache() if use_cache else None
+    digest = image_digest(image_bytes) if image_bytes else None
+    # structured answers are cached apart from free-text ones and per schema version
+    key_model = f"{model}/{SCHEMA_VERSION}" if STRUCTURED else model
+    key = make_key(rx_text, instructions, key_model, image_digest=digest)
+    text = cache.get(key) if cache is not None else None
+    if text is None:
+        def call():
+            data, data_type = image_bytes, mime_type
+            if data:
+                image = prepare_image(data, data_type, digest=digest)
+                data, data_type = image.data, image.mime_type
+            if route is None:
+                result, complete = _call_model(rx_text, instructions, api_key, data, data_type, model,
+                                               progress=progress)
+                cacheable = complete
+            else:
+                result, complete, cacheable = _routed_call(rx_text, instructions, api_key, data,
+                                                           data_type, route, progress)
+            if complete and cacheable and cache is not None:
+                cache.put(key, model, result)
+            return result, complete
+
+        try:
+            text, complete = _flights.run(key, call, progress)
+        except Exception as e:
+            return f"{INFERENCE_FAILED}{str(e)}"
+        if not complete:
+            return text + INFERENCE_CANCELLED
+    if rx_text:
+        get_memory().add(rx_text, text, customer=customer, order_id=order_id, key=key)
+    return text
@@ -0,0 +1,153 @@
+"""Local stand-in for the Gemini API, for trying the client without a key.
+
+Usage::
+
+    python -m rxpro.gemini_stub [--port 8765] [--chunks 20] [--delay 0.2] [--fail 0]
+                                [--confidence HIGH]
+    RXPRO_GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta streamlit run app.py
+
+``generateContent`` answers with one JSON body after ``chunks * delay``
+seconds; ``streamGenerateContent?alt=sse`` sends the same answer as ``chunks``
+server-sent events over a chunked response, ``delay`` seconds apart. The first
+``--fail`` requests get a 503 to exercise the retries. Requests with a JSON
+``responseSchema`` get a schema answer listing the RX items; free-text requests
+that ask for a ``CONFIDENCE:`` line get one. Either reports ``--confidence``.
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+_MODEL = re.compile(r"/models/([^/:]+):")
+
+
+def _structured_answer(texts, images, model, confidence):
+    items = [item.strip() for text in texts for line in text.splitlines()
+             if line.lower().startswith("items:") for item in line[6:].split(",") if item.strip()]
+    return json.dumps({
+        "items": [{"item": item, "status": "ok", "note": f"stub ({model})"} for item in items]
+        or [{"item": f"{images} image(s)" if images else "RX", "status": "ok", "note": f"stub ({model})"}],
+        "interactions": [],
+        "allergies": [],
+        "substitutes": [],
+        "counseling": ["No issues found by the stub."],
+        "confidence": confidence.lower(),
+    })
+
+
+def stub_answer(payload, chunks, model="stub", confidence="HIGH"):
+    """Split a canned safety-check answer that echoes the request into ``chunks`` pieces."""
+    texts = [part.get("text", "") for content in payload.get("contents", [])
+             for part in content.get("parts", [])]
+    images = sum("inline_data" in part for content in payload.get("contents", [])
+                 for part in content.get("parts", []))
+    if payload.get("generationConfig", {}).get("responseSchema"):
+        answer = _structured_answer(texts, images, model, confidence)
+    else:
+        answer = (f"STUB SAFETY CHECK ({model})\n" + "\n".join(texts)
+                  + (f"\n({images} image(s) received)" if images else "")
+                  + "\nNo issues found by the stub.\n")
+        if any("CONFIDENCE:" in text for text in texts):
+            answer += f"CONFIDENCE: {confidence}\n"
+    size = max(1, -(-len(answer) // chunks))
+    return [answer[i:i + size] for i in range(0, len(answer), size)]
+
+
+def _candidate(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    chunks = 20
+    delay = 0.2
+    confidence = "HIGH"
+    failures_left = 0
+    _fail_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _should_fail(self):
+        with self._fail_lock:
+            if StubHandler.failures_left > 0:
+                StubHandler.failures_left -= 1
+                return True
+        return False
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        match = _MODEL.search(self.path)
+        pieces = stub_answer(payload, self.chunks, match.group(1) if match else "stub", self.confidence)
+        if self._should_fail():
+            self._send_json(503, {"error": {"code": 503, "message": "stub unavailable"}})
+        elif ":streamGenerateContent" in self.path:
+            self._stream(pieces)
+        elif ":generateContent" in self.path:
+            time.sleep(self.chunks * self.delay)
+            self._send_json(200, _candidate("".join(pieces)))
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": f"no stub for {self.path}"}})
+
+    def _stream(self, pieces):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for piece in pieces:
+                time.sleep(self.delay)
+                event = f"data: {json.dumps(_candidate(piece))}\r\n\r\n".encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client cancelled
+
+
+def serve(port=8765, chunks=20, delay=0.2, fail=0, confidence="HIGH"):
+    """Start the stub on a background thread and return the server."""
+    handler = type("Handler", (StubHandler,),
+                   {"chunks": chunks, "delay": delay, "confidence": confidence})
+    StubHandler.failures_left = fail
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rxpro.gemini_stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds between streamed chunks")
+    parser.add_argument("--fail", type=int, default=0, help="answer the first N requests with 503")
+    parser.add_argument("--confidence", default="HIGH", choices=["HIGH", "MEDIUM", "LOW"],
+                        help="confidence reported when the fast tier asks for one")
+    args = parser.parse_args(argv)
+    server = serve(args.port, args.chunks, args.delay, args.fail, args.confidence)
+    print(f"Gemini stub on http://127.0.0.1:{server.server_port}/v1beta")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Collision-free order and drug ids.
+
+Ids are drawn from the ``IdSequences`` table with a single
+``UPDATE ... RETURNING`` inside the caller's write transaction, so every
+terminal and process sharing the database gets distinct, increasing values
+and new rows are appended at the right edge of the primary-key B-tree.
+Order ids also carry the branch prefix (``RXPRO_BRANCH``) so branches that
+keep separate databases still never mint the same ``O_id``.
+"""
+import os
+
+BRANCH = os.environ.get("RXPRO_BRANCH", "RX")
+ORDER_SEQUENCE = "order"
+DRUG_SEQUENCE = "drug"
+DRUG_ID_FLOOR = 1000
+
+
+# =====================================================
+# TABLE CREATION
+# =====================================================
+def sequence_create_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS IdSequences(
+                S_Name TEXT PRIMARY KEY NOT NULL,
+                S_Next INTEGER NOT NULL)''')
+
+
+def sequence_migrate(conn):
+    sequence_create_table(conn)
+    sequence_seed(conn, ORDER_SEQUENCE)
+    sequence_seed(conn, DRUG_SEQUENCE, _drug_floor(conn))
+
+
+def sequence_seed(conn, name, start=1):
+    conn.execute('INSERT OR IGNORE INTO IdSequences (S_Name, S_Next) VALUES (?, ?)', (name, start))
+
+
+# =====================================================
+# ALLOCATION
+# =====================================================
+def _drug_floor(conn):
+    # Drugs added with an explicit D_id (imports, old random ids) must not be reissued.
+    top = conn.execute('SELECT MAX(D_id) FROM Drugs').fetchone()[0]
+    return max(DRUG_ID_FLOOR, (top or 0) + 1)
+
+
+def reserve_ids(conn, name, count, floor=1):
+    """Reserve ``count`` consecutive values of sequence ``name``; call inside a transaction."""
+    row = conn.execute('UPDATE IdSequences SET S_Next = MAX(S_Next, ?) + ? WHERE S_Name = ? RETURNING S_Next',
+                       (floor, count, name)).fetchone()
+    start = row[0] - count
+    return range(start, start + count)
+
+
+def next_order_ids(conn, count=1, branch=BRANCH):
+    return [format_order_id(n, branch) for n in reserve_ids(conn, ORDER_SEQUENCE, count)]
+
+
+def next_drug_ids(conn, count=1):
+    return list(reserve_ids(conn, DRUG_SEQUENCE, count, _drug_floor(conn)))
+
+
+def format_order_id(n, branch=BRANCH):
+    # Zero-padded so text order matches allocation order.
+    return f"{branch}-O{n:09d}"
@@ -0,0 +1,83 @@
+"""Shrink prescription photos before they are sent to Gemini.
+
+Phone photos arrive as multi-megabyte JPEGs/PNGs and are base64-encoded into
+the request body. ``prepare_image`` applies the EXIF rotation, downscales so
+the longest edge is at most ``RXPRO_IMAGE_MAX_EDGE`` pixels (default 1600) and
+re-encodes as JPEG at ``RXPRO_IMAGE_QUALITY`` (default 82). The SHA-256 of the
+*uploaded* bytes is the image's identity: the inference cache is keyed on it,
+so a re-uploaded photo is answered without decoding it again, and recent
+prepared images are kept in memory by digest.
+
+Pillow ships with Streamlit; without it images are sent unchanged.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+IMAGE_MAX_EDGE = int(os.environ.get("RXPRO_IMAGE_MAX_EDGE", "1600"))
+IMAGE_QUALITY = int(os.environ.get("RXPRO_IMAGE_QUALITY", "82"))
+PREPARED_CACHE_SIZE = 16
+
+PreparedImage = namedtuple("PreparedImage", ["data", "mime_type", "digest", "original_size"])
+
+_prepared = OrderedDict()
+_prepared_lock = threading.Lock()
+
+
+def image_digest(image_bytes):
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def _recompress(image_bytes, max_edge, quality):
+    """Return ``(jpeg_bytes, changed)``, or ``(None, False)`` if Pillow can't read it.
+
+    ``changed`` is true when the pixels differ from the upload (rotated or
+    scaled), in which case the JPEG must be sent even if it is not smaller.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None, False
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as original:
+            changed = original.getexif().get(0x0112, 1) != 1  # EXIF Orientation
+            img = ImageOps.exif_transpose(original)
+            if max(img.size) > max_edge:
+                img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                changed = True
+            if img.mode in ("RGBA", "LA", "P"):
+                # flatten transparency onto white rather than black
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, "white")
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            elif img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            out = io.BytesIO()
+            img.save(out, "JPEG", quality=quality, optimize=True)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, False
+    return out.getvalue(), changed
+
+
+def prepare_image(image_bytes, mime_type="image/jpeg", max_edge=IMAGE_MAX_EDGE, quality=IMAGE_QUALITY,
+                  digest=None):
+    """Return a ``PreparedImage`` for upload; the original is kept if it is already smaller."""
+    digest = digest or image_digest(image_bytes)
+    key = (digest, max_edge, quality)
+    with _prepared_lock:
+        if key in _prepared:
+            _prepared.move_to_end(key)
+            return _prepared[key]
+    data, changed = _recompress(image_bytes, max_edge, quality)
+    if data is None or (not changed and len(data) >= len(image_bytes)):
+        prepared = PreparedImage(image_bytes, mime_type, digest, len(image_bytes))
+    else:
+        prepared = PreparedImage(data, "image/jpeg", digest, len(image_bytes))
+    with _prepared_lock:
+        _prepared[key] = prepared
+        while len(_prepared) > PREPARED_CACHE_SIZE:
+            _prepared.popitem(last=False)
+    return prepared
@@ -0,0 +1,131 @@
+"""Persistent cache for Gemini RX safety-check responses.
+
+Entries are keyed by a SHA-256 over the normalized RX text, the instruction
+list, the model name and any image bytes, so a repeat prescription or a
+re-clicked "Run AI Inference" is answered from SQLite instead of the API.
+Entries expire after a TTL and the least recently used are evicted beyond
+``max_entries``.
+
+Settings come from the environment:
+
+- ``RXPRO_INFERENCE_CACHE_PATH`` (default ``inference_cache.db``)
+- ``RXPRO_INFERENCE_CACHE_TTL`` in seconds (default 7 days)
+- ``RXPRO_INFERENCE_CACHE_MAX_ENTRIES`` (default 5000)
+"""
+import hashlib
+import os
+import threading
+import time
+
+from rxpro.db import ConnectionPool
+
+CACHE_PATH = os.environ.get("RXPRO_INFERENCE_CACHE_PATH", "inference_cache.db")
+CACHE_TTL = float(os.environ.get("RXPRO_INFERENCE_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.environ.get("RXPRO_INFERENCE_CACHE_MAX_ENTRIES", "5000"))
+
+
+# =====================================================
+# KEYS
+# =====================================================
+def normalize_rx(rx_text):
+    """Collapse whitespace and blank lines so cosmetic edits hit the same entry."""
+    lines = (" ".join(line.split()) for line in (rx_text or "").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def normalize_instructions(instructions):
+    if isinstance(instructions, str):
+        instructions = instructions.splitlines()
+    return sorted({" ".join(i.split()) for i in instructions if i and i.strip()})
+
+
+def make_key(rx_text, instructions, model, image_bytes=None, image_digest=None):
+    """``image_digest`` is the hex SHA-256 of ``image_bytes``, if already computed."""
+    h = hashlib.sha256()
+    for part in (normalize_rx(rx_text), "\n".join(normalize_instructions(instructions)), model):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    if image_digest is None and image_bytes:
+        image_digest = hashlib.sha256(image_bytes).hexdigest()
+    if image_digest:
+        h.update(bytes.fromhex(image_digest))
+    return h.hexdigest()
+
+
+# =====================================================
+# CACHE
+# =====================================================
+class InferenceCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._pool = ConnectionPool(path=path, size=4)
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._stats_lock = threading.Lock()
+        with self._pool.connection() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS InferenceCache(
+                        K TEXT PRIMARY KEY,
+                        Model TEXT NOT NULL,
+                        Response TEXT NOT NULL,
+                        Created REAL NOT NULL,
+                        Accessed REAL NOT NULL,
+                        Hits INT NOT NULL DEFAULT 0)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_inferencecache_accessed ON InferenceCache(Accessed)')
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def get(self, key):
+        now = time.time()
+        with self._pool.connection() as conn:
+            row = conn.execute('SELECT Response, Created FROM InferenceCache WHERE K=?', (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute('DELETE FROM InferenceCache WHERE K=?', (key,))
+                self._count("expired")
+                self._count("misses")
+                return None
+            conn.execute('UPDATE InferenceCache SET Accessed=?, Hits=Hits+1 WHERE K=?', (now, key))
+        self._count("hits")
+        return row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._pool.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO InferenceCache (K, Model, Response, Created, Accessed) '
+                         'VALUES (?,?,?,?,?)', (key, model, response, now, now))
+            expired = conn.execute('DELETE FROM InferenceCache WHERE Created < ?', (now - self.ttl,)).rowcount
+            evicted = conn.execute('''DELETE FROM InferenceCache WHERE K IN (
+                                        SELECT K FROM InferenceCache ORDER BY Accessed DESC
+                                        LIMIT -1 OFFSET ?)''', (self.max_entries,)).rowcount
+        self._count("expired", expired)
+        self._count("evictions", evicted)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._pool.connection() as conn:
+            stats["entries"] = conn.execute('SELECT COUNT(*) FROM InferenceCache').fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._pool.connection() as conn:
+            conn.execute('DELETE FROM InferenceCache')
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InferenceCache()
+    return _cache
@@ -0,0 +1,158 @@
+"""Local, deterministic drug-drug interaction screening.
+
+Known pairs live in the ``DrugInteractions`` table (loadable from CSV) and are
+held in memory as a dict keyed by the normalized, ordered drug-name pair, so a
+cart of k items costs k*(k-1)/2 dict lookups. Only carts the index cannot
+resolve (a drug it has never seen, or a large polypharmacy basket) still need
+the Gemini "Check drug interactions" instruction.
+
+CSV columns: ``drug_a,drug_b,severity,description``. A row with an empty
+``drug_b`` marks a drug as covered with no known interactions::
+
+    python -m rxpro.interactions load drug_interactions.csv
+"""
+import csv
+import re
+import sys
+import threading
+from collections import namedtuple
+from itertools import combinations
+
+from rxpro import db
+
+INTERACTION_INSTRUCTION = "Check drug interactions"
+# Baskets at least this large are escalated even when every pair is known.
+COMPLEX_CART_SIZE = 6
+
+Interaction = namedtuple("Interaction", "drug_a drug_b severity description")
+Screening = namedtuple("Screening", "hits unknown escalate")
+
+_STRENGTH = re.compile(r"\b\d+(\.\d+)?\s*(mg|mcg|g|ml|iu|%)?\b")
+
+
+def normalize_drug_name(name):
+    """``"Aspirin 75mg "`` -> ``"aspirin"``; strengths and case are ignored."""
+    name = _STRENGTH.sub(" ", (name or "").casefold())
+    return " ".join(name.split())
+
+
+def _pair(a, b):
+    return (a, b) if a <= b else (b, a)
+
+
+# =====================================================
+# INDEX
+# =====================================================
+class InteractionIndex:
+    def __init__(self, rows=()):
+        self.pairs = {}
+        self.covered = set()
+        for drug_a, drug_b, severity, description in rows:
+            a, b = normalize_drug_name(drug_a), normalize_drug_name(drug_b)
+            if a:
+                self.covered.add(a)
+            if b:
+                self.covered.add(b)
+            if a and b and a != b:
+                self.pairs[_pair(a, b)] = Interaction(drug_a, drug_b, severity, description)
+
+    def screen(self, names):
+        """Screen a cart's drug names against every known pair."""
+        normalized = []
+        for name in names:
+            n = normalize_drug_name(name)
+            if n and n not in normalized:
+                normalized.append(n)
+        hits = [self.pairs[p] for p in (_pair(a, b) for a, b in combinations(normalized, 2))
+                if p in self.pairs]
+        unknown = [n for n in normalized if n not in self.covered]
+        escalate = bool(unknown) or len(normalized) >= COMPLEX_CART_SIZE
+        return Screening(hits, unknown, escalate)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                rows = db.fetchall('SELECT I_DrugA, I_DrugB, I_Severity, I_Description FROM DrugInteractions')
+                _index = InteractionIndex(rows)
+    return _index
+
+
+def invalidate_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+# =====================================================
+# LOADING
+# =====================================================
+def interaction_load_csv(path):
+    """Upsert interaction rows from a CSV file; returns the number of rows."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [(r["drug_a"].strip(), (r.get("drug_b") or "").strip(),
+                 (r.get("severity") or "").strip(), (r.get("description") or "").strip())
+                for r in csv.DictReader(f) if r.get("drug_a", "").strip()]
+    with db.transaction() as conn:
+        conn.executemany('INSERT OR REPLACE INTO DrugInteractions '
+                         '(I_Key, I_DrugA, I_DrugB, I_Severity, I_Description) VALUES (?,?,?,?,?)',
+                         [("|".join(_pair(normalize_drug_name(a), normalize_drug_name(b))), a, b, s, d)
+                          for a, b, s, d in rows])
+    invalidate_index()
+    return len(rows)
+
+
+# =====================================================
+# RX CHECK PLANNING
+# =====================================================
+def screen_cart(names):
+    return get_index().screen(names)
+
+
+def plan_rx_check(items, instructions):
+    """Split an RX check into local screening and what still needs Gemini.
+
+    Returns ``(llm_instructions, screening)``. When the interaction check is
+    requested and the local index resolves the cart, that instruction is
+    answered locally and dropped from the list sent to the model.
+    """
+    if INTERACTION_INSTRUCTION not in instructions or not items:
+        return list(instructions), None
+    screening = screen_cart(items)
+    if screening.escalate:
+        return list(instructions), screening
+    return [i for i in instructions if i != INTERACTION_INSTRUCTION], screening
+
+
+def format_screening(screening):
+    if screening is None:
+        return ""
+    lines = [f"⚠️ {hit.drug_a} + {hit.drug_b} ({hit.severity}): {hit.description}" for hit in screening.hits]
+    if not lines:
+        lines.append("✅ No known interactions between these items.")
+    if screening.unknown:
+        lines.append("Not in local interaction index (sent to AI): " + ", ".join(screening.unknown))
+    elif screening.escalate:
+        lines.append("Complex basket: interaction check also sent to AI.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2 or argv[0] != "load":
+        print("usage: python -m rxpro.interactions load <interactions.csv>")
+        return 2
+    from rxpro.data import init_db
+    init_db()
+    print(f"Loaded {interaction_load_csv(argv[1])} interaction rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Bulk inventory import from supplier CSVs.
+
+Columns follow ``drugs.csv``: ``D_Name,D_ExpDate,D_Use,D_Qty,D_id,D_Price``
+(``Image_Path`` and any other extra columns are ignored). Rows are read and
+upserted ``IMPORT_CHUNK`` at a time inside a single transaction, keyed on the
+drug name. Like the admin "Add Drug" form (:func:`rxpro.data.drug_add_data`),
+an import adds stock: an existing drug keeps its ``D_id``, its ``D_Qty`` grows
+by the row's quantity and it gets the new expiry (and use / price when given).
+Rows repeating a name within one file add up. Bad rows are rejected with a
+reason instead of aborting the import::
+
+    python -m rxpro.inventory import drugs.csv
+"""
+import csv
+import io
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from rxpro import db, ids
+
+IMPORT_CHUNK = int(os.environ.get("RXPRO_IMPORT_CHUNK", "1000"))
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y"]
+MIN_YEAR, MAX_YEAR = 1990, 2100
+
+ImportReport = namedtuple("ImportReport", "read upserted rejected seconds")
+Rejected = namedtuple("Rejected", "line name reason")
+
+_DIGITS = re.compile(r"\d+")
+
+
+# =====================================================
+# VALIDATION
+# =====================================================
+def normalize_date(value):
+    """ISO ``YYYY-MM-DD`` for the supported layouts, or ``None``.
+
+    Years outside ``MIN_YEAR``..``MAX_YEAR`` (e.g. the ``31/12/244`` typo) are
+    rejected rather than guessed at.
+    """
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+        if MIN_YEAR <= parsed.year <= MAX_YEAR:
+            return parsed.isoformat()
+        return None
+    return None
+
+
+def normalize_drug_id(value):
+    """Supplier ids like ``D12`` become ``12``; blank means allocate one."""
+    match = _DIGITS.search(value or "")
+    return int(match.group()) if match else None
+
+
+def parse_row(row):
+    """``(D_Name, D_ExpDate, D_Use, D_Qty, D_id, D_Price)`` or a rejection reason string."""
+    name = (row.get("D_Name") or "").strip()
+    if not name:
+        return "missing D_Name"
+    expdate = normalize_date(row.get("D_ExpDate"))
+    if expdate is None:
+        return f"bad D_ExpDate {row.get('D_ExpDate')!r}"
+    try:
+        qty = int(float((row.get("D_Qty") or "0").strip()))
+        price = float((row.get("D_Price") or "0").strip())
+    except ValueError:
+        return f"bad D_Qty/D_Price {row.get('D_Qty')!r}/{row.get('D_Price')!r}"
+    if qty < 0 or price < 0:
+        return "negative D_Qty/D_Price"
+    return (name, expdate, (row.get("D_Use") or "").strip(), qty, normalize_drug_id(row.get("D_id")), price)
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+_UPSERT = '''INSERT INTO Drugs (D_Name, D_ExpDate, D_Use, D_Qty, D_id, D_Price) VALUES (?,?,?,?,?,?)
+             ON CONFLICT(D_Name) DO UPDATE SET D_ExpDate=excluded.D_ExpDate,
+             D_Use=CASE WHEN excluded.D_Use <> '' THEN excluded.D_Use ELSE D_Use END,
+             D_Qty=D_Qty + excluded.D_Qty,
+             D_Price=CASE WHEN excluded.D_Price > 0 THEN excluded.D_Price ELSE D_Price END'''
+
+
+def _upsert_chunk(conn, rows, rejected):
+    """Upsert one chunk of parsed ``(line, row)`` pairs; returns the number written."""
+    names = [row[0] for _, row in rows]
+    placeholders = ",".join("?" * len(names))
+    existing = dict(conn.execute(f'SELECT D_Name, D_id FROM Drugs WHERE D_Name IN ({placeholders})', names))
+    wanted = [row[4] for _, row in rows if row[0] not in existing and row[4] is not None]
+    placeholders = ",".join("?" * len(wanted)) or "NULL"
+    taken = dict(conn.execute(f'SELECT D_id, D_Name FROM Drugs WHERE D_id IN ({placeholders})', wanted))
+
+    batch = {}
+    for line, (name, expdate, use, qty, Did, price) in rows:
+        if name in batch:
+            qty += batch[name][3]
+            Did = batch[name][4]
+            use = use or batch[name][2]
+            price = price or batch[name][5]
+        elif name in existing:
+            Did = existing[name]
+        elif Did is not None and taken.get(Did, name) != name:
+            rejected.append(Rejected(line, name, f"D_id {Did} already belongs to {taken[Did]!r}"))
+            continue
+        else:
+            taken[Did] = name
+        batch[name] = [name, expdate, use, qty, Did, price]
+
+    # Rows with supplier ids go first so the sequence floor sees them before allocating.
+    numbered = [row for row in batch.values() if row[4] is not None]
+    unnumbered = [row for row in batch.values() if row[4] is None]
+    conn.executemany(_UPSERT, numbered)
+    for row, Did in zip(unnumbered, ids.next_drug_ids(conn, len(unnumbered))):
+        row[4] = Did
+    conn.executemany(_UPSERT, unnumbered)
+    return len(batch)
+
+
+def drug_import_csv(f, chunk=IMPORT_CHUNK):
+    """Stream a drugs CSV (an open text file) into ``Drugs``; returns an ``ImportReport``."""
+    from rxpro.data import invalidate_drug_cache
+
+    start = time.perf_counter()
+    read = upserted = 0
+    rejected = []
+    with db.transaction() as conn:
+        pending = []
+        for line, row in enumerate(csv.DictReader(f), 2):
+            read += 1
+            parsed = parse_row(row)
+            if isinstance(parsed, str):
+                rejected.append(Rejected(line, (row.get("D_Name") or "").strip(), parsed))
+                continue
+            pending.append((line, parsed))
+            if len(pending) >= chunk:
+                upserted += _upsert_chunk(conn, pending, rejected)
+                pending = []
+        if pending:
+            upserted += _upsert_chunk(conn, pending, rejected)
+    invalidate_drug_cache()
+    return ImportReport(read, upserted, rejected, time.perf_counter() - start)
+
+
+def drug_import_upload(uploaded, chunk=IMPORT_CHUNK):
+    """:func:`drug_import_csv` for a Streamlit ``UploadedFile`` (binary, possibly BOM-prefixed)."""
+    return drug_import_csv(io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline=""), chunk)
+
+
+def format_import_report(report, max_rejected=50):
+    rate = report.read / report.seconds if report.seconds else 0.0
+    lines = [f"Read {report.read} rows, upserted {report.upserted}, rejected {len(report.rejected)} "
+             f"in {report.seconds:.2f}s ({rate:,.0f} rows/s)."]
+    lines += [f"  line {r.line} {r.name or '(no name)'}: {r.reason}" for r in report.rejected[:max_rejected]]
+    if len(report.rejected) > max_rejected:
+        lines.append(f"  ... and {len(report.rejected) - max_rejected} more")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2 or argv[0] != "import":
+        print("usage: python -m rxpro.inventory import <drugs.csv>")
+        return 2
+    from rxpro.data import init_db
+    init_db()
+    with open(argv[1], newline="", encoding="utf-8-sig") as f:
+        print(format_import_report(drug_import_csv(f)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
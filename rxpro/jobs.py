@@ -0,0 +1,206 @@
+"""Background job queue for slow calls such as the Gemini safety check.
+
+Jobs run on a process-wide thread pool, so a Streamlit script run only submits
+work and stores the job id in ``st.session_state``; the page polls
+:func:`job_status` instead of blocking. The pool size is the concurrency limit
+toward the upstream API (``RXPRO_INFERENCE_WORKERS``, default 4); extra jobs
+wait in the queue.
+
+Streaming jobs (:func:`submit_streaming_job`) also get a :class:`JobProgress`
+they append partial output to, which the page shows while the job runs and
+which carries the cancel request back to the job.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+INFERENCE_WORKERS = int(os.environ.get("RXPRO_INFERENCE_WORKERS", "4"))
+JOB_RETENTION = float(os.environ.get("RXPRO_JOB_RETENTION", "3600"))
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+UNKNOWN = "unknown"
+
+
+class JobProgress:
+    """Partial output of a running job plus its cancel flag; shared across threads.
+
+    :meth:`restart` drops the output so far when the job starts over (e.g. on
+    another model) and sets a ``note`` saying why; ``restarts`` counts them.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._note = ""
+        self._restarts = 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def append(self, text):
+        with self._lock:
+            self._parts.append(text)
+
+    def restart(self, note=""):
+        with self._lock:
+            self._parts = []
+            self._note = note
+            self._restarts += 1
+
+    @property
+    def text(self):
+        with self._lock:
+            return "".join(self._parts)
+
+    @property
+    def note(self):
+        with self._lock:
+            return self._note
+
+    def snapshot(self):
+        """``(restarts, text, note)`` read together."""
+        with self._lock:
+            return self._restarts, "".join(self._parts), self._note
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class JobQueue:
+    def __init__(self, max_workers=INFERENCE_WORKERS, retention=JOB_RETENTION):
+        self.max_workers = max_workers
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rxpro-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` and return its job id."""
+        return self._submit(None, fn, args, kwargs)
+
+    def submit_streaming(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, progress=JobProgress(), **kwargs)`` and return its job id."""
+        progress = JobProgress()
+        return self._submit(progress, fn, args, dict(kwargs, progress=progress))
+
+    def _submit(self, progress, fn, args, kwargs):
+        self._prune()
+        job_id = uuid.uuid4().hex
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._jobs[job_id] = (future, time.time(), progress)
+        return job_id
+
+    def _entry(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id, (None, None, None))
+
+    def _future(self, job_id):
+        return self._entry(job_id)[0]
+
+    def status(self, job_id):
+        future, _, progress = self._entry(job_id)
+        if future is None:
+            return UNKNOWN
+        if future.running():
+            return RUNNING
+        if not future.done():
+            return PENDING
+        if future.cancelled() or (progress is not None and progress.cancelled):
+            return CANCELLED
+        if future.exception() is not None:
+            return FAILED
+        return DONE
+
+    def progress(self, job_id):
+        """Partial output of a streaming job so far ("" for other jobs)."""
+        progress = self._entry(job_id)[2]
+        return progress.text if progress is not None else ""
+
+    def progress_note(self, job_id):
+        """Why a streaming job restarted its output ("" if it has not)."""
+        progress = self._entry(job_id)[2]
+        return progress.note if progress is not None else ""
+
+    def result(self, job_id, timeout=None):
+        """Return the job's result, waiting up to ``timeout`` seconds.
+
+        Re-raises the job's exception; raises ``KeyError`` for unknown ids.
+        """
+        future = self._future(job_id)
+        if future is None:
+            raise KeyError(job_id)
+        return future.result(timeout=timeout)
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet, or ask a running streaming job to stop."""
+        future, _, progress = self._entry(job_id)
+        if future is None:
+            return False
+        if progress is not None:
+            progress.cancel()
+        return future.cancel() or progress is not None
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            stale = [job_id for job_id, (future, submitted, _) in self._jobs.items()
+                     if future.done() and submitted < cutoff]
+            for job_id in stale:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+def submit_job(fn, *args, **kwargs):
+    return get_queue().submit(fn, *args, **kwargs)
+
+
+def submit_streaming_job(fn, *args, **kwargs):
+    return get_queue().submit_streaming(fn, *args, **kwargs)
+
+
+def job_status(job_id):
+    return get_queue().status(job_id)
+
+
+def job_result(job_id, timeout=None):
+    return get_queue().result(job_id, timeout=timeout)
+
+
+def job_progress(job_id):
+    return get_queue().progress(job_id)
+
+
+def job_progress_note(job_id):
+    return get_queue().progress_note(job_id)
+
+
+def cancel_job(job_id):
+    return get_queue().cancel(job_id)
@@ -0,0 +1,131 @@
+"""Semantic memory of past AI safety-check results.
+
+Every successful safety check is embedded and stored in ``AdeMemory`` with the
+customer and order it was run for. Vectors are kept in a NumPy matrix in
+process memory and searched by brute-force cosine similarity, which is a few
+milliseconds even at 100k checks, so similar past prescriptions (or the same
+patient's history) surface without a new LLM call.
+
+The default embedder hashes words and character trigrams into a fixed-size
+vector: deterministic, local and free. Pass another object with ``dim`` and
+``embed(text)`` to :class:`AdeMemory` to use a learned embedding model.
+"""
+import hashlib
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from rxpro import db
+
+EMBED_DIM = 256
+
+Match = namedtuple("Match", "score customer order_id rx_text result date")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+# =====================================================
+# EMBEDDING
+# =====================================================
+class HashingEmbedder:
+    def __init__(self, dim=EMBED_DIM):
+        self.dim = dim
+
+    def _features(self, text):
+        words = _TOKEN.findall((text or "").casefold())
+        for word in words:
+            yield "w:" + word
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield "c:" + padded[i:i + 3]
+
+    def embed(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+
+# =====================================================
+# MEMORY
+# =====================================================
+class AdeMemory:
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashingEmbedder()
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        # Picks up rows written by this or any other process since the last call.
+        rows = db.fetchall('SELECT M_id, M_Vector FROM AdeMemory WHERE M_id > ? ORDER BY M_id',
+                           (self._last_id,))
+        if not rows:
+            return
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        vectors = np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        self._ids = np.concatenate([self._ids, ids])
+        self._matrix = np.vstack([self._matrix, vectors])
+        self._last_id = int(ids[-1])
+
+    def add(self, rx_text, result, customer=None, order_id=None, key=None):
+        """Store one safety-check result; repeats of the same key/customer/order are ignored."""
+        vector = self.embedder.embed(rx_text)
+        db.execute('INSERT OR IGNORE INTO AdeMemory '
+                   '(M_Key, M_Customer, M_Order, M_RxText, M_Result, M_Date, M_Vector) '
+                   'VALUES (?,?,?,?,?,?,?)',
+                   (key or hashlib.sha256(rx_text.encode("utf-8")).hexdigest(), customer or "",
+                    order_id or "", rx_text, result,
+                    datetime.now().isoformat(sep=" ", timespec="seconds"), vector.tobytes()))
+
+    def search(self, text, k=5, customer=None, min_score=0.0):
+        """Top-k stored checks most similar to ``text``, optionally for one customer."""
+        query = self.embedder.embed(text)
+        with self._lock:
+            self._refresh()
+            ids, matrix = self._ids, self._matrix
+        if not len(ids):
+            return []
+        if customer is not None:
+            own = db.fetchall('SELECT M_id FROM AdeMemory WHERE M_Customer=?', (customer,))
+            mask = np.isin(ids, np.array([r[0] for r in own], dtype=np.int64))
+            ids, matrix = ids[mask], matrix[mask]
+            if not len(ids):
+                return []
+        scores = matrix @ query
+        n = min(len(ids), k)
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        wanted = {int(ids[i]): float(scores[i]) for i in top if scores[i] >= min_score}
+        if not wanted:
+            return []
+        rows = db.fetchall(f'SELECT M_id, M_Customer, M_Order, M_RxText, M_Result, M_Date FROM AdeMemory '
+                           f'WHERE M_id IN ({",".join("?" * len(wanted))})', list(wanted))
+        matches = [Match(wanted[r[0]], *r[1:]) for r in rows]
+        matches.sort(key=lambda m: m.score, reverse=True)
+        return matches
+
+    def customer_history(self, customer, limit=20):
+        rows = db.fetchall('SELECT M_Customer, M_Order, M_RxText, M_Result, M_Date FROM AdeMemory '
+                           'WHERE M_Customer=? ORDER BY M_id DESC LIMIT ?', (customer, limit))
+        return [Match(1.0, *r) for r in rows]
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_memory():
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = AdeMemory()
+    return _memory
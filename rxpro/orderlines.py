@@ -0,0 +1,177 @@
+"""Normalized order line items.
+
+``Orders`` keeps one header row per sale; each item sold lives in
+``OrderLines`` so totals and per-item reports are SQL aggregates instead of
+``split(",")`` loops over ``O_Items`` / ``O_Qty`` / ``O_Prices``.
+"""
+import numpy as np
+import pandas as pd
+
+ORDER_LINE_COLUMNS = ["Customer", "Item", "Qty", "Price", "Subtotal", "Order ID"]
+ITEM_REPORT_COLUMNS = ["Item", "Qty Sold", "Orders", "Revenue"]
+MIGRATE_CHUNK = 10000
+
+
+# =====================================================
+# TABLE CREATION
+# =====================================================
+def orderline_create_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS OrderLines(
+                OL_id INTEGER PRIMARY KEY,
+                O_id TEXT NOT NULL,
+                D_id INT,
+                OL_Name TEXT NOT NULL,
+                OL_Qty INT NOT NULL,
+                OL_Price REAL NOT NULL)''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orderlines_order ON OrderLines(O_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orderlines_drug ON OrderLines(D_id)')
+
+
+# =====================================================
+# LEGACY COLUMN PARSING
+# =====================================================
+def split_order_items(O_Items, O_Qty, O_Prices=""):
+    """Turn the comma-joined legacy columns into ``(name, qty, price)`` tuples.
+
+    Orders written by app4.py have no prices; those lines get a price of 0.
+    """
+    items = O_Items.split(",") if O_Items else []
+    qtys = O_Qty.split(",") if O_Qty else []
+    prices = O_Prices.split(",") if O_Prices else []
+    lines = []
+    for i, name in enumerate(items):
+        qty = int(qtys[i]) if i < len(qtys) and qtys[i].strip() else 0
+        price = float(prices[i]) if i < len(prices) and prices[i].strip() else 0.0
+        lines.append((name, qty, price))
+    return lines
+
+
+def _align(values, fields, counts):
+    """Pad or truncate comma lists so each has as many fields as its ``O_Items``."""
+    if np.array_equal(fields, counts):
+        return values
+    return [v if f == n else ",".join((v.split(",") + [""] * n)[:n])
+            for v, f, n in zip(values, fields, counts)]
+
+
+def _field_counts(values):
+    return np.char.count(np.asarray(values, dtype=str), ",") + 1
+
+
+def _to_numbers(parts):
+    """Parse a flat list of numeric strings; blanks and junk become 0."""
+    try:
+        return np.asarray(parts, dtype=float)
+    except ValueError:
+        return pd.to_numeric(pd.Series(parts, dtype=object).str.strip(), errors="coerce").fillna(0).to_numpy(float)
+
+
+def expand_orders(orders):
+    """Vectorized :func:`split_order_items` over a batch of ``Orders`` rows.
+
+    ``orders`` are ``(O_Name, O_Items, O_Qty, O_Prices, O_id)`` tuples; returns
+    one row per line item with ``ORDER_LINE_COLUMNS``. Each column is joined
+    and split once for the whole batch and the header fields are repeated per
+    line, so there is no Python work per item. This beats ``Series.str.split``
+    plus ``DataFrame.explode``, which builds a Python list per order and is
+    slower than the plain loop (``python -m rxpro.benchmarks orders``).
+
+    Order views and exports read ``OrderLines`` through SQL and never call
+    this; it serves the :func:`orderline_migrate` backfill and the PoS receipt.
+    """
+    orders = list(orders)
+    if not orders:
+        return pd.DataFrame(columns=ORDER_LINE_COLUMNS)
+    names, items, qtys, prices, ids = (list(col) for col in zip(*orders))
+    items = [v or "" for v in items]
+    qtys = [v or "" for v in qtys]
+    prices = [v or "" for v in prices]
+    counts = _field_counts(items)
+    qtys = _align(qtys, _field_counts(qtys), counts)
+    prices = _align(prices, _field_counts(prices), counts)
+    qty = _to_numbers(",".join(qtys).split(","))
+    price = _to_numbers(",".join(prices).split(","))
+    qty = np.where(qty == qty.astype(int), qty, 0).astype(int)
+    lines = pd.DataFrame({
+        "Customer": np.repeat(np.asarray(names, dtype=object), counts),
+        "Item": ",".join(items).split(","),
+        "Qty": qty,
+        "Price": price,
+        "Subtotal": qty * price,
+        "Order ID": np.repeat(np.asarray(ids, dtype=object), counts),
+    }, columns=ORDER_LINE_COLUMNS)
+    return lines[lines["Item"] != ""].reset_index(drop=True)
+
+
+def order_totals(lines):
+    """Per-order totals and the grand total for an :func:`expand_orders` frame."""
+    per_order = lines.groupby("Order ID", sort=False)["Subtotal"].sum()
+    return per_order, float(lines["Subtotal"].sum())
+
+
+def order_rx_text(order):
+    """RX text for an ``Orders`` row, as sent to the AI safety check."""
+    O_Name, O_Items, O_Qty, O_Prices = order[:4]
+    rx_text = f"Customer: {O_Name}\nItems: {O_Items}\nQuantities: {O_Qty}"
+    if O_Prices:
+        rx_text += f"\nPrices: {O_Prices}"
+    return rx_text
+
+
+# =====================================================
+# WRITES
+# =====================================================
+def orderline_add_data(conn, O_id, lines):
+    """Insert ``(name, qty, price)`` lines for an order; the caller commits."""
+    conn.executemany(
+        'INSERT INTO OrderLines (O_id, D_id, OL_Name, OL_Qty, OL_Price) '
+        'VALUES (?, (SELECT D_id FROM Drugs WHERE D_Name=?), ?, ?, ?)',
+        [(O_id, name, name, qty, price) for name, qty, price in lines])
+
+
+def orderline_migrate(conn):
+    """One-time backfill of OrderLines from the comma-joined Orders columns."""
+    rows = conn.execute('''SELECT O_Name, O_Items, O_Qty, O_Prices, O_id FROM Orders o
+                           WHERE NOT EXISTS (SELECT 1 FROM OrderLines l WHERE l.O_id = o.O_id)''')
+    while True:
+        batch = rows.fetchmany(MIGRATE_CHUNK)
+        if not batch:
+            return
+        lines = expand_orders(batch)
+        conn.executemany(
+            'INSERT INTO OrderLines (O_id, D_id, OL_Name, OL_Qty, OL_Price) '
+            'VALUES (?, (SELECT D_id FROM Drugs WHERE D_Name=?), ?, ?, ?)',
+            zip(lines["Order ID"], lines["Item"], lines["Item"],
+                lines["Qty"].tolist(), lines["Price"].tolist()))
+
+
+# =====================================================
+# READS
+# =====================================================
+_LINE_SELECT = '''SELECT o.O_Name, l.OL_Name, l.OL_Qty, l.OL_Price, l.OL_Qty * l.OL_Price, l.O_id
+                  FROM OrderLines l JOIN Orders o ON o.O_id = l.O_id'''
+
+
+def orderline_view_data(conn, customername):
+    return conn.execute(_LINE_SELECT + ' WHERE o.O_Name=? ORDER BY l.OL_id',
+                        (customername,)).fetchall()
+
+
+def orderline_view_all_data(conn):
+    return conn.execute(_LINE_SELECT + ' ORDER BY l.OL_id').fetchall()
+
+
+def order_total(conn, customername=None):
+    if customername is None:
+        row = conn.execute('SELECT COALESCE(SUM(OL_Qty * OL_Price), 0) FROM OrderLines').fetchone()
+    else:
+        row = conn.execute('''SELECT COALESCE(SUM(l.OL_Qty * l.OL_Price), 0)
+                              FROM OrderLines l JOIN Orders o ON o.O_id = l.O_id
+                              WHERE o.O_Name=?''', (customername,)).fetchone()
+    return row[0]
+
+
+def item_sales_report(conn):
+    return conn.execute('''SELECT OL_Name, SUM(OL_Qty), COUNT(DISTINCT O_id), SUM(OL_Qty * OL_Price)
+                           FROM OrderLines GROUP BY OL_Name
+                           ORDER BY SUM(OL_Qty * OL_Price) DESC''').fetchall()
@@ -0,0 +1,66 @@
+"""``EXPLAIN QUERY PLAN`` check for the hot lookup queries.
+
+Run ``python -m rxpro.queryplan [path/to/drug_data.db]`` after a schema change:
+it prints each plan and exits non-zero if any hot query scans a table instead
+of searching an index.
+"""
+import sys
+
+from rxpro import data, db, schema
+
+# name -> (sql, sample params); keep in step with rxpro.data.
+HOT_QUERIES = {
+    "customer_auth": (
+        'SELECT C_Name,C_Password,C_Email,C_State,C_Number FROM Customers '
+        'WHERE C_Name=? AND C_Password=?', ("", "")),
+    "drug_view_data": (
+        'SELECT D_Name,D_ExpDate,D_Use,D_Qty,D_id FROM Drugs WHERE D_Name=?', ("",)),
+    "checkout_decrement": (data.CHECKOUT_DECREMENT, (0, "")),
+    "checkout_new_drug": (data.CHECKOUT_KNOWN_DRUGS.format(placeholders="?,?"), ("", "")),
+    "order_view_data": (
+        'SELECT O_Name,O_Items,O_Qty,O_Prices,O_id FROM Orders WHERE O_Name=?', ("",)),
+    "orderline_view_data": (
+        'SELECT o.O_Name, l.OL_Name, l.OL_Qty, l.OL_Price, l.OL_Qty * l.OL_Price, l.O_id '
+        'FROM OrderLines l JOIN Orders o ON o.O_id = l.O_id WHERE o.O_Name=? ORDER BY l.OL_id', ("",)),
+    "order_total": (
+        'SELECT COALESCE(SUM(l.OL_Qty * l.OL_Price), 0) FROM OrderLines l '
+        'JOIN Orders o ON o.O_id = l.O_id WHERE o.O_Name=?', ("",)),
+}
+
+
+def explain(conn, sql, params=()):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def find_table_scans(conn, queries=None):
+    """Return ``{name: plan}`` for every query whose plan contains a full SCAN."""
+    offenders = {}
+    for name, (sql, params) in (queries or HOT_QUERIES).items():
+        plan = explain(conn, sql, params)
+        if any(step.startswith("SCAN ") and "CONSTANT ROW" not in step for step in plan):
+            offenders[name] = plan
+    return offenders
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        db.configure(path=argv[0])
+    with db.connection() as conn:
+        schema.migrate(conn)
+        return report(conn)
+
+
+def report(conn):
+    for name, (sql, params) in HOT_QUERIES.items():
+        print(f"{name}:")
+        for step in explain(conn, sql, params):
+            print(f"    {step}")
+    offenders = find_table_scans(conn)
+    for name in offenders:
+        print(f"FULL SCAN: {name}")
+    return 1 if offenders else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
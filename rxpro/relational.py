@@ -0,0 +1,532 @@
+"""Dashboard backend on the relational schema in ``drugdatabase.sql``.
+
+``customer`` / ``seller`` / ``product`` / per-seller ``inventory(pid, sid)`` /
+``orders`` replace the flat tables. Each terminal is one seller
+(``RXPRO_BRANCH``); its stock is the ``inventory`` rows for that ``sid`` and
+admin order views are scoped to it, while a customer's history spans every
+seller. Each ``orders`` row is one line item, so a checkout writes one row
+per cart line.
+
+For local runs the MySQL DDL is translated to SQLite (:func:`translate_mysql_ddl`)
+and applied to its own database file, ``RXPRO_RELATIONAL_DB_PATH``
+(default ``drugdatabase.db``). Unlike InnoDB, SQLite does not index foreign
+keys by itself, so the translation adds those indexes; they back the
+per-seller and per-customer order lookups. The two stored procedures become
+parameterized queries run through :func:`call_procedure`, and
+``inventorytrigger`` (a single keyed ``UPDATE``) carries over as is, with the
+``unsigned`` quantity enforced by a ``CHECK``.
+
+Mapping onto the flat API's row shapes: ``uid`` is the customer name,
+``address`` holds the branch (``C_State``), ``pid`` is the drug id and the
+schema has no usage column, so ``D_Use`` is kept in ``product.manufacturer``.
+"""
+import os
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from itertools import groupby
+from pathlib import Path
+
+from rxpro import data, ids
+from rxpro.backend import InsufficientStock
+from rxpro.db import ConnectionPool
+from rxpro.search import SEARCH_LIMIT
+
+RELATIONAL_DB_PATH = os.environ.get("RXPRO_RELATIONAL_DB_PATH", "drugdatabase.db")
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "drugdatabase.sql"
+SELLER_ID = ids.BRANCH
+PRODUCT_SEQUENCE = "product"
+NEW_DRUG_EXPDATE = "2026-12-31"
+
+Translation = namedtuple("Translation", "statements procedures skipped")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+# =====================================================
+# MYSQL -> SQLITE DDL
+# =====================================================
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+_DELIMITER = re.compile(r"^\s*DELIMITER\s+(\S+)\s*$", re.I | re.M)
+_CREATE_TABLE = re.compile(r"CREATE\s+TABLE\s+(\w+)\s*\((.*)\)", re.I | re.S)
+_ALTER_AUTO_INCREMENT = re.compile(r"ALTER\s+TABLE\s+(\w+)\s+AUTO_INCREMENT\s*=\s*(\d+)", re.I)
+_TRIGGER = re.compile(r"CREATE\s+TRIGGER\s+(\w+)\s+(BEFORE|AFTER)\s+(INSERT|UPDATE|DELETE)\s+ON\s+(\w+)"
+                      r"\s+FOR\s+EACH\s+ROW\s+BEGIN\s+(.*)\s+END", re.I | re.S)
+_SET_NEW_NOW = re.compile(r"^SET\s+NEW\.(\w+)\s*=\s*NOW\(\)\s*;?$", re.I)
+_PROCEDURE = re.compile(r"CREATE\s+PROCEDURE\s+(\w+)\s*\((.*?)\)\s*BEGIN\s+(.*?)\s*;?\s*END", re.I | re.S)
+_COLUMN_TYPES = [
+    (re.compile(r"^(varchar|char)\(\d+\)$", re.I), "TEXT"),
+    (re.compile(r"^(bigint|int|integer|smallint|tinyint)$", re.I), "INTEGER"),
+    (re.compile(r"^(date|datetime|timestamp)$", re.I), "TEXT"),
+]
+NOW_SQL = "datetime('now', 'localtime')"
+
+
+def split_mysql_script(script):
+    """Statements of a ``mysql`` client script, honouring ``DELIMITER`` changes."""
+    script = _LINE_COMMENT.sub("", script)
+    statements, delimiter, pos = [], ";", 0
+    for match in list(_DELIMITER.finditer(script)) + [None]:
+        end = match.start() if match else len(script)
+        statements += [s.strip() for s in script[pos:end].split(delimiter) if s.strip()]
+        if match:
+            delimiter, pos = match.group(1), match.end()
+    return statements
+
+
+def _split_columns(body):
+    parts, depth, current = [], 0, ""
+    for ch in body:
+        depth += ch == "("
+        depth -= ch == ")"
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    return parts + [current.strip()] if current.strip() else parts
+
+
+def _translate_table(name, body):
+    parts = _split_columns(body)
+    auto = [p.split()[0] for p in parts if re.search(r"\bAUTO_INCREMENT\b", p, re.I)]
+    columns, constraints, indexes = [], [], []
+    for part in parts:
+        words = part.split()
+        head = words[0].upper()
+        if head == "PRIMARY":
+            if not (auto and re.fullmatch(rf"PRIMARY\s+KEY\s*\(\s*{auto[0]}\s*\)", part, re.I)):
+                constraints.append(part)
+        elif head == "UNIQUE":
+            m = re.match(r"UNIQUE\s+KEY\s+(\w+)\s*(\(.*\))", part, re.I)
+            constraints.append(f"CONSTRAINT {m.group(1)} UNIQUE {m.group(2)}" if m else part)
+        elif head in ("KEY", "INDEX"):
+            m = re.match(r"(?:KEY|INDEX)\s+(\w+)\s*(\(.*\))", part, re.I)
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {name}_{m.group(1)} ON {name}{m.group(2)}")
+        elif head == "CONSTRAINT":
+            constraints.append(part)
+            m = re.match(r"CONSTRAINT\s+(\w+)\s+FOREIGN\s+KEY\s*(\([^)]*\))", part, re.I)
+            if m:
+                indexes.append(f"CREATE INDEX IF NOT EXISTS {name}_{m.group(1)} ON {name}{m.group(2)}")
+        else:
+            column, sql_type, rest = words[0], words[1], " ".join(words[2:])
+            for pattern, sqlite_type in _COLUMN_TYPES:
+                if pattern.match(sql_type):
+                    sql_type = sqlite_type
+                    break
+            unsigned = re.search(r"\bunsigned\b", rest, re.I)
+            rest = re.sub(r"\bunsigned\b\s*", "", rest, flags=re.I)
+            if column in auto:
+                columns.append(f"{column} INTEGER PRIMARY KEY AUTOINCREMENT")
+                continue
+            check = f" CHECK ({column} >= 0)" if unsigned else ""
+            columns.append(f"{column} {sql_type} {rest}".rstrip() + check)
+    table = f"CREATE TABLE IF NOT EXISTS {name} (\n  " + ",\n  ".join(columns + constraints) + "\n)"
+    return [table] + indexes
+
+
+def _translate_trigger(match):
+    name, timing, event, table, body = match.groups()
+    body = body.strip()
+    set_now = _SET_NEW_NOW.match(body)
+    if set_now and timing.upper() == "BEFORE" and event.upper() == "INSERT":
+        # SQLite triggers cannot assign to NEW; stamp the row right after it lands.
+        return (f"CREATE TRIGGER IF NOT EXISTS {name} AFTER INSERT ON {table} FOR EACH ROW BEGIN "
+                f"UPDATE {table} SET {set_now.group(1)} = {NOW_SQL} WHERE rowid = NEW.rowid; END")
+    if re.search(r"\b(DECLARE|INTO|SET\s+NEW)\b", body, re.I):
+        return None
+    body = re.sub(r"\bNOW\(\)", NOW_SQL, body, flags=re.I).rstrip(";")
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {timing} {event} ON {table} FOR EACH ROW BEGIN {body}; END"
+
+
+def translate_mysql_ddl(script):
+    """Translate a ``drugdatabase.sql``-style MySQL script for SQLite.
+
+    Returns ``Translation(statements, procedures, skipped)``: SQLite DDL to
+    run in order, ``{name: (params, sql)}`` for single-``SELECT`` procedures
+    (parameters become ``?`` placeholders) and ``(statement head, reason)``
+    for anything with no faithful SQLite equivalent.
+    """
+    statements, procedures, skipped = [], {}, []
+    for stmt in split_mysql_script(script):
+        head = " ".join(stmt.split()[:3])
+        if re.match(r"(CREATE\s+(SCHEMA|DATABASE)|USE)\b", stmt, re.I):
+            continue
+        table = _CREATE_TABLE.match(stmt)
+        if table:
+            statements += _translate_table(table.group(1), table.group(2))
+            continue
+        alter = _ALTER_AUTO_INCREMENT.match(stmt)
+        if alter:
+            name, start = alter.group(1), int(alter.group(2))
+            statements.append(f"INSERT INTO sqlite_sequence (name, seq) SELECT '{name}', {start - 1} "
+                              f"WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{name}')")
+            continue
+        trigger = _TRIGGER.match(stmt)
+        if trigger:
+            translated = _translate_trigger(trigger)
+            if translated:
+                statements.append(translated)
+            else:
+                skipped.append((f"TRIGGER {trigger.group(1)}", "procedural body (DECLARE / SELECT ... INTO)"))
+            continue
+        procedure = _PROCEDURE.match(stmt)
+        if procedure and re.match(r"SELECT\b", procedure.group(3), re.I) and ";" not in procedure.group(3):
+            params = [p.split()[1] for p in procedure.group(2).split(",") if p.strip()]
+            sql = procedure.group(3)
+            for param in params:
+                sql = re.sub(rf"\b{param}\b", "?", sql)
+            procedures[procedure.group(1)] = (params, sql)
+            continue
+        skipped.append((head, "unsupported statement"))
+    return Translation(statements, procedures, skipped)
+
+
+# =====================================================
+# CONNECTION / SETUP
+# =====================================================
+_pool = None
+_procedures = {}
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _init_lock:
+            if _pool is None:
+                _pool = ConnectionPool(path=RELATIONAL_DB_PATH, pragmas=["foreign_keys=ON"])
+    return _pool
+
+
+def init_db():
+    """Apply the translated schema and register this terminal's seller, once per process."""
+    global _initialized
+    pool = get_pool()
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        # Interaction screening, ADE memory and batch screenings stay in the flat database.
+        data.init_db()
+        translation = translate_mysql_ddl(SCHEMA_PATH.read_text(encoding="utf-8"))
+        with pool.transaction() as conn:
+            for statement in translation.statements:
+                conn.execute(statement)
+            _ensure_sale_ids(conn)
+            ids.sequence_create_table(conn)
+            top = conn.execute("SELECT MAX(CAST(pid AS INTEGER)) FROM product").fetchone()[0]
+            ids.sequence_seed(conn, PRODUCT_SEQUENCE, max(ids.DRUG_ID_FLOOR, (top or 0) + 1))
+            conn.execute("INSERT OR IGNORE INTO seller (sid, sname) VALUES (?, ?)", (SELLER_ID, SELLER_ID))
+        _procedures.update(translation.procedures)
+        _initialized = True
+
+
+def _ensure_sale_ids(conn):
+    # orders.saleid was added to drugdatabase.sql after the first relational databases were made.
+    if "saleid" not in {row[1] for row in conn.execute("PRAGMA table_info(orders)")}:
+        conn.execute("ALTER TABLE orders ADD COLUMN saleid INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS orders_uid_saleid ON orders(uid, saleid)")
+
+
+def call_procedure(name, *args):
+    """Run a translated stored procedure, e.g. ``call_procedure("getorders", uid)``."""
+    init_db()
+    params, sql = _procedures[name]
+    if len(args) != len(params):
+        raise TypeError(f"{name}() takes {len(params)} arguments ({len(args)} given)")
+    with get_pool().connection() as conn:
+        return conn.execute(sql, args).fetchall()
+
+
+def _fetchall(sql, params=()):
+    with get_pool().connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _fetchone(sql, params=()):
+    with get_pool().connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def _where(clauses):
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+
+# =====================================================
+# CUSTOMERS
+# =====================================================
+def customer_add_data(Cname, Cpass, Cemail, Cstate, Cnumber):
+    phno = int(Cnumber) if str(Cnumber).strip().isdigit() else None
+    with get_pool().connection() as conn:
+        conn.execute("INSERT INTO customer (uid, pass, fname, email, address, phno) VALUES (?,?,?,?,?,?)",
+                     (Cname, Cpass, Cname, Cemail, Cstate, phno))
+
+
+def customer_auth(username, password):
+    return _fetchone("SELECT uid, pass, email, address, phno FROM customer WHERE uid=? AND pass=?",
+                     (username, password))
+
+
+def _customer_filters(name=None, branch=None):
+    where, params = [], []
+    if name:
+        where.append("uid >= ? AND uid < ?")
+        params += [name, name + "\uffff"]
+    if branch:
+        where.append("address = ?")
+        params.append(branch)
+    return where, params
+
+
+def customer_page(after=None, page_size=50, **filters):
+    where, params = _customer_filters(**filters)
+    if after is not None:
+        where.append("rowid > ?")
+        params.append(after)
+    return _fetchall("SELECT uid, pass, email, address, phno, rowid FROM customer" + _where(where)
+                     + " ORDER BY rowid LIMIT ?", params + [page_size])
+
+
+def customer_count(**filters):
+    where, params = _customer_filters(**filters)
+    return _fetchone("SELECT COUNT(*) FROM customer" + _where(where), params)[0]
+
+
+# =====================================================
+# PRODUCTS / INVENTORY
+# =====================================================
+def _next_pids(conn, count=1):
+    top = conn.execute("SELECT MAX(CAST(pid AS INTEGER)) FROM product").fetchone()[0]
+    floor = max(ids.DRUG_ID_FLOOR, (top or 0) + 1)
+    return [str(n) for n in ids.reserve_ids(conn, PRODUCT_SEQUENCE, count, floor)]
+
+
+def drug_next_id():
+    with get_pool().transaction() as conn:
+        return _next_pids(conn)[0]
+
+
+def drug_add_data(Dname, Dexpdate, Duse, Dqty, Did=None, Dprice=0):
+    """Add a product and this seller's stock of it; ``Did=None`` allocates a pid.
+
+    ``product.pname`` is unique: for a known name the stock is added to this
+    seller's inventory and the product's expiry (and usage / price when given)
+    updated, as the flat backend does.
+    """
+    with get_pool().transaction() as conn:
+        row = conn.execute("SELECT pid FROM product WHERE pname = ?", (Dname,)).fetchone()
+        if row is not None:
+            pid = row[0]
+            conn.execute("""UPDATE product SET exp = ?,
+                            manufacturer = CASE WHEN ? <> '' THEN ? ELSE manufacturer END,
+                            price = CASE WHEN ? > 0 THEN ? ELSE price END
+                            WHERE pid = ?""", (Dexpdate, Duse, Duse, Dprice, Dprice, pid))
+        else:
+            pid = str(Did) if Did is not None else _next_pids(conn)[0]
+            conn.execute("INSERT INTO product (pid, pname, manufacturer, exp, price) VALUES (?,?,?,?,?)",
+                         (pid, Dname, Duse, Dexpdate, Dprice))
+        conn.execute("""INSERT INTO inventory (pid, pname, quantity, sid) VALUES (?,?,?,?)
+                        ON CONFLICT(pid, sid) DO UPDATE SET quantity = quantity + excluded.quantity""",
+                     (pid, Dname, Dqty, SELLER_ID))
+    return pid
+
+
+def drug_catalog():
+    return _fetchall("SELECT pname, pid, price FROM product ORDER BY pname")
+
+
+def _starts_word(column):
+    return f"(' ' || {column}) LIKE ? ESCAPE '\\'"
+
+
+def drug_search(query, limit=SEARCH_LIMIT):
+    """Top ``limit`` ``(D_Name, D_id, D_Price)`` matches, as :func:`rxpro.search.drug_search`.
+
+    Each typed word must start a word of the name, usage (``manufacturer``)
+    or pid, ignoring case; products matching on the name rank first.
+    """
+    words = _WORD.findall(query or "")
+    if not words:
+        return _fetchall("SELECT pname, pid, price FROM product ORDER BY pname LIMIT ?", (limit,))
+    patterns = ["% " + re.sub(r"([%_\\])", r"\\\1", w) + "%" for w in words]
+    anywhere = " AND ".join(f"({_starts_word('pname')} OR {_starts_word('manufacturer')} "
+                            f"OR {_starts_word('pid')})" for _ in words)
+    in_name = " AND ".join(_starts_word("pname") for _ in words)
+    return _fetchall(f"SELECT pname, pid, price FROM product WHERE {anywhere} "
+                     f"ORDER BY ({in_name}) DESC, pname LIMIT ?",
+                     [p for p in patterns for _ in range(3)] + patterns + [limit])
+
+
+def drug_view_all_data():
+    """This seller's stock as ``(D_Name, D_ExpDate, D_Use, D_Qty, D_id)``."""
+    return _fetchall("""SELECT p.pname, p.exp, p.manufacturer, i.quantity, p.pid
+                        FROM inventory i JOIN product p ON p.pid = i.pid
+                        WHERE i.sid = ? ORDER BY p.pname""", (SELLER_ID,))
+
+
+# =====================================================
+# ORDERS
+# =====================================================
+# A line's order id is its sale's (the first oid of the checkout, as printed on
+# the receipt); lines written before saleid existed keep their own oid.
+_SALE_ID = "COALESCE(o.saleid, o.oid)"
+_LINE_COLUMNS = f"o.uid, p.pname, o.quantity, o.price, o.quantity * o.price, {_SALE_ID}, o.orderdatetime"
+_LINE_FROM = " FROM orders o JOIN product p ON p.pid = o.pid"
+_LINE_SELECT = "SELECT " + _LINE_COLUMNS + _LINE_FROM
+
+
+def order_checkout(O_Name, cart, default_use="N/A"):
+    """Record a sale at this seller; one ``orders`` row per cart line.
+
+    Products new to the catalog are created, and products this seller has
+    no ``inventory`` row for are stocked with the sold quantity, as the flat
+    POS does. Stock is decremented by ``inventorytrigger``; a cart larger
+    than this seller's stock raises :class:`InsufficientStock` and nothing
+    is written. Every line gets the sale's first ``oid`` as its ``saleid``,
+    which is also what is returned.
+    """
+    stock = {}
+    for item in cart:
+        name = str(item["Name"])
+        if name in stock:
+            stock[name]["Qty"] += int(item["Qty"])
+        else:
+            stock[name] = {"Qty": int(item["Qty"]), "Use": item.get("Use") or default_use,
+                           "ID": item.get("ID"), "Price": item["Price"]}
+
+    with get_pool().transaction() as conn:
+        placeholders = ",".join("?" * len(stock)) or "NULL"
+        pids = dict(conn.execute(f"SELECT pname, pid FROM product WHERE pname IN ({placeholders})",
+                                 list(stock)))
+        new = [name for name in stock if name not in pids]
+        unnumbered = [name for name in new if stock[name]["ID"] is None]
+        for name, pid in zip(unnumbered, _next_pids(conn, len(unnumbered))):
+            stock[name]["ID"] = pid
+        conn.executemany("INSERT INTO product (pid, pname, manufacturer, exp, price) VALUES (?,?,?,?,?)",
+                         [(str(stock[n]["ID"]), n, stock[n]["Use"], NEW_DRUG_EXPDATE, stock[n]["Price"])
+                          for n in new])
+        pids.update((n, str(stock[n]["ID"])) for n in new)
+
+        on_hand = dict(conn.execute(f"SELECT pid, quantity FROM inventory WHERE sid = ? AND pid IN ({placeholders})",
+                                    [SELLER_ID] + [pids[n] for n in stock]))
+        short = [f"{n} ({on_hand[pids[n]]} left, {s['Qty']} ordered)" for n, s in stock.items()
+                 if pids[n] in on_hand and on_hand[pids[n]] < s["Qty"]]
+        if short:
+            raise InsufficientStock("Not enough stock at this branch: " + ", ".join(short))
+
+        # inventorytrigger takes each line's quantity off this seller's stock;
+        # products without a row yet are stocked afterwards, so they keep the sold quantity.
+        try:
+            conn.executemany("INSERT INTO orders (pid, sid, uid, quantity, price) VALUES (?,?,?,?,?)",
+                             [(pids[str(item["Name"])], SELLER_ID, O_Name, int(item["Qty"]), item["Price"])
+                              for item in cart])
+        except sqlite3.IntegrityError as e:
+            if "quantity >= 0" not in str(e):
+                raise
+            raise InsufficientStock("Not enough stock at this branch for this order.") from e
+        conn.executemany("INSERT INTO inventory (pid, pname, quantity, sid) VALUES (?,?,?,?)",
+                         [(pids[n], n, s["Qty"], SELLER_ID) for n, s in stock.items() if pids[n] not in on_hand])
+        last = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'orders'").fetchone()[0]
+        first = last - len(cart) + 1
+        conn.execute("UPDATE orders SET saleid = ? WHERE oid BETWEEN ? AND ?", (first, first, last))
+    return str(first)
+
+
+def order_latest_data(customername):
+    """The customer's latest checkout as a flat ``(O_Name, O_Items, O_Qty, O_Prices, O_id)`` row.
+
+    ``orders`` has no order header; the lines sharing the customer's latest
+    ``saleid`` stand in for it. Lines written before ``saleid`` existed fall
+    back to grouping by ``orderdatetime``.
+    """
+    latest = _fetchall("SELECT saleid, orderdatetime FROM orders WHERE uid = ? ORDER BY oid DESC LIMIT 1",
+                       (customername,))
+    if not latest:
+        return None
+    saleid, orderdatetime = latest[0]
+    if saleid is not None:
+        rows = _fetchall(_LINE_SELECT + " WHERE o.uid = ? AND o.saleid = ? ORDER BY o.oid",
+                         (customername, saleid))
+    else:
+        rows = _fetchall(_LINE_SELECT + """ WHERE o.uid = ? AND o.saleid IS NULL
+                            AND o.orderdatetime = ? ORDER BY o.oid""", (customername, orderdatetime))
+    if not rows:
+        return None
+    return (customername, ",".join(r[1] for r in rows), ",".join(str(r[2]) for r in rows),
+            ",".join(str(r[3]) for r in rows), str(rows[0][5]))
+
+
+def _stream(sql, params, chunk):
+    with get_pool().connection() as conn:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                return
+            yield from rows
+
+
+def iter_orders(customername, chunk=500):
+    """One flat order row per checkout, oldest first.
+
+    A sale's lines are written in one transaction, so their oids are
+    consecutive and ordering by oid keeps each sale together.
+    """
+    lines = _stream(f"""SELECT o.uid, p.pname, o.quantity, o.price, {_SALE_ID}
+                        FROM orders o JOIN product p ON p.pid = o.pid
+                        WHERE o.uid = ? ORDER BY o.oid""", (customername,), chunk)
+    for sale, rows in groupby(lines, key=lambda row: row[4]):
+        rows = list(rows)
+        yield (customername, ",".join(r[1] for r in rows), ",".join(str(r[2]) for r in rows),
+               ",".join(str(r[3]) for r in rows), str(sale))
+
+
+def iter_order_lines(customername, chunk=500):
+    return _stream(_LINE_SELECT + " WHERE o.uid = ? ORDER BY o.oid", (customername,), chunk)
+
+
+def _orderline_filters(customer=None, item=None, date_from=None, date_to=None):
+    """Customer views span every seller; without a customer the view is this seller's sales."""
+    where, params = [], []
+    if customer:
+        where.append("o.uid = ?")
+        params.append(customer)
+    else:
+        where.append("o.sid = ?")
+        params.append(SELLER_ID)
+    if item:
+        where.append("p.pname = ? COLLATE NOCASE")
+        params.append(item)
+    if date_from:
+        where.append("o.orderdatetime >= ?")
+        params.append(str(date_from))
+    if date_to:
+        where.append("o.orderdatetime < ?")
+        params.append(str(date_to) + "\uffff")
+    return where, params
+
+
+def orderline_page(after=None, page_size=50, **filters):
+    where, params = _orderline_filters(**filters)
+    if after is not None:
+        where.append("o.oid < ?")
+        params.append(after)
+    return _fetchall("SELECT " + _LINE_COLUMNS + ", o.oid" + _LINE_FROM + _where(where)
+                     + " ORDER BY o.oid DESC LIMIT ?", params + [page_size])
+
+
+def orderline_count(**filters):
+    where, params = _orderline_filters(**filters)
+    return _fetchone("SELECT COUNT(*), COALESCE(SUM(o.quantity * o.price), 0)" + _LINE_FROM + _where(where),
+                     params)
+
+
+def item_sales_report():
+    """``ITEM_REPORT_COLUMNS`` for this seller."""
+    return _fetchall(f"""SELECT p.pname, SUM(o.quantity), COUNT(DISTINCT {_SALE_ID}), SUM(o.quantity * o.price)
+                        FROM orders o JOIN product p ON p.pid = o.pid
+                        WHERE o.sid = ? GROUP BY p.pname
+                        ORDER BY SUM(o.quantity * o.price) DESC""", (SELLER_ID,))
@@ -0,0 +1,130 @@
+"""Pick the Gemini model tier for an RX safety check.
+
+Short, text-only checks (a few items, no substitution or unresolved
+interaction question) go to the fast tier; photos, larger baskets and the
+harder instructions go to Pro. The fast tier reports its confidence (the
+schema's ``confidence`` field, or a final ``CONFIDENCE:`` line for free-text
+answers), and a ``LOW`` answer or a fast-tier timeout is re-run on Pro.
+
+Pro calls are capped per hour (``RXPRO_ROUTER_PRO_PER_HOUR``, 0 = no cap);
+past the cap, checks stay on the fast tier and are not escalated.
+
+Settings come from the environment:
+
+- ``RXPRO_GEMINI_MODEL`` / ``RXPRO_GEMINI_FAST_MODEL`` (``gemini-2.5-pro`` /
+  ``gemini-2.5-flash``)
+- ``RXPRO_GEMINI_PRO_TIMEOUT`` / ``RXPRO_GEMINI_FAST_TIMEOUT``, read timeouts
+  in seconds (120 / 30)
+- ``RXPRO_GEMINI_FAST_RETRIES``, retries on the fast tier (0, so a timed-out
+  fast call goes straight to Pro); Pro uses ``RXPRO_GEMINI_MAX_RETRIES``
+- ``RXPRO_ROUTER_FAST_MAX_ITEMS`` (3)
+- ``RXPRO_ROUTER_ESCALATE_ON``, comma-separated confidence levels (``LOW``)
+"""
+import os
+import re
+import threading
+import time
+from collections import deque, namedtuple
+
+from rxpro.interactions import INTERACTION_INSTRUCTION
+from rxpro.inference_cache import normalize_instructions
+from rxpro.safety import parse_safety_check
+
+GEMINI_MODEL = os.environ.get("RXPRO_GEMINI_MODEL", "gemini-2.5-pro")
+FAST_MODEL = os.environ.get("RXPRO_GEMINI_FAST_MODEL", "gemini-2.5-flash")
+PRO_TIMEOUT = float(os.environ.get("RXPRO_GEMINI_PRO_TIMEOUT", "120"))
+FAST_TIMEOUT = float(os.environ.get("RXPRO_GEMINI_FAST_TIMEOUT", "30"))
+FAST_RETRIES = int(os.environ.get("RXPRO_GEMINI_FAST_RETRIES", "0"))
+FAST_MAX_ITEMS = int(os.environ.get("RXPRO_ROUTER_FAST_MAX_ITEMS", "3"))
+PRO_PER_HOUR = int(os.environ.get("RXPRO_ROUTER_PRO_PER_HOUR", "0"))
+ESCALATE_ON = {level.strip().upper() for level in
+               os.environ.get("RXPRO_ROUTER_ESCALATE_ON", "LOW").split(",") if level.strip()}
+
+# Instructions that need Pro-level reasoning whenever they reach the model; the
+# interaction check only gets here when the local index could not answer it.
+PRO_INSTRUCTIONS = {INTERACTION_INSTRUCTION, "Recommend substitute drugs"}
+
+CONFIDENCE_INSTRUCTION = ("End your answer with a final line 'CONFIDENCE: HIGH', 'CONFIDENCE: MEDIUM' "
+                          "or 'CONFIDENCE: LOW' saying how sure you are of this safety check.")
+ESCALATED_NOTE = "[Escalated to {model}: {reason}]\n\n"
+
+# max_retries None means the client's own (RXPRO_GEMINI_MAX_RETRIES).
+Tier = namedtuple("Tier", ["name", "model", "read_timeout", "max_retries"])
+Route = namedtuple("Route", ["tier", "reason"])
+
+FAST = Tier("fast", FAST_MODEL, FAST_TIMEOUT, FAST_RETRIES)
+PRO = Tier("pro", GEMINI_MODEL, PRO_TIMEOUT, None)
+
+_CONFIDENCE = re.compile(r"^\W*confidence\W*(high|medium|low)\W*$", re.IGNORECASE)
+
+
+# =====================================================
+# ROUTING
+# =====================================================
+def count_rx_items(rx_text):
+    """Items in an RX: the ``Items:`` list of a POS order, else its non-empty lines."""
+    lines = [line.strip() for line in (rx_text or "").splitlines() if line.strip()]
+    for line in lines:
+        if line.lower().startswith("items:"):
+            return len([i for i in line[6:].split(",") if i.strip()])
+    return len(lines)
+
+
+def route_rx_check(item_count, instructions, has_image=False):
+    """Return the ``Route`` for a check of ``item_count`` items.
+
+    ``instructions`` are the ones that will be sent to the model, i.e. after
+    :func:`rxpro.interactions.plan_rx_check` has answered what it can locally.
+    """
+    if has_image:
+        return Route(PRO, "prescription image")
+    if item_count > FAST_MAX_ITEMS:
+        return Route(PRO, f"{item_count} items")
+    hard = sorted(PRO_INSTRUCTIONS.intersection(normalize_instructions(instructions)))
+    if hard:
+        return Route(PRO, ", ".join(hard).lower())
+    return Route(FAST, f"{item_count} item{'s' if item_count != 1 else ''}, routine instructions")
+
+
+def split_confidence(text):
+    """Return ``(text, level or None)``, stripping a free-text ``CONFIDENCE:`` line."""
+    check = parse_safety_check(text)[1]
+    if check is not None:
+        return text, check.confidence.upper() or None
+    lines = text.rstrip().splitlines()
+    if lines:
+        match = _CONFIDENCE.match(lines[-1].strip())
+        if match:
+            return "\n".join(lines[:-1]).rstrip() + "\n", match.group(1).upper()
+    return text, None
+
+
+# =====================================================
+# PRO BUDGET
+# =====================================================
+class ProBudget:
+    """Allows at most ``per_hour`` Pro calls in any rolling hour (0 = unlimited)."""
+
+    def __init__(self, per_hour=PRO_PER_HOUR):
+        self.per_hour = per_hour
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def take(self):
+        if not self.per_hour:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] >= 3600:
+                self._calls.popleft()
+            if len(self._calls) >= self.per_hour:
+                return False
+            self._calls.append(now)
+            return True
+
+
+_budget = ProBudget()
+
+
+def get_budget():
+    return _budget
@@ -0,0 +1,197 @@
+"""Structured RX safety-check prompts and results.
+
+The model is sent a short task-keyword prompt (:func:`build_prompt`) and asked
+to answer in ``RESPONSE_SCHEMA`` JSON, which :func:`parse_safety_check` turns
+into ``SafetyCheck`` records and :func:`render_safety_check` formats for the
+page. Branch boilerplate (PoS id, VAT note, disclaimer) is rendered locally
+rather than sent with every call. Results that are not schema JSON (free-text
+answers cached before, failures) are shown as they are. A streamed or cancelled
+answer is cut back to its last complete value, so it renders the fields
+received so far.
+"""
+import json
+from collections import namedtuple
+
+from rxpro.inference_cache import normalize_instructions, normalize_rx
+
+SCHEMA_VERSION = "rxcheck-1"
+
+ItemFlag = namedtuple("ItemFlag", ["item", "dose", "status", "note"])
+Interaction = namedtuple("Interaction", ["drug_a", "drug_b", "severity", "note"])
+AllergyHit = namedtuple("AllergyHit", ["item", "allergen", "note"])
+Substitute = namedtuple("Substitute", ["item", "substitute", "reason"])
+SafetyCheck = namedtuple("SafetyCheck", [
+    "items", "interactions", "allergies", "substitutes", "counseling", "confidence",
+])
+
+
+def _object(properties, required):
+    return {"type": "OBJECT", "properties": properties, "required": required}
+
+
+def _strings(*names):
+    return {name: {"type": "STRING"} for name in names}
+
+
+RESPONSE_SCHEMA = _object({
+    "items": {"type": "ARRAY", "items": _object(
+        dict(_strings("item", "dose", "note"),
+             status={"type": "STRING", "enum": ["ok", "caution", "stop"]}),
+        ["item", "status"])},
+    "interactions": {"type": "ARRAY", "items": _object(
+        dict(_strings("drug_a", "drug_b", "note"),
+             severity={"type": "STRING", "enum": ["minor", "moderate", "major"]}),
+        ["drug_a", "drug_b", "severity"])},
+    "allergies": {"type": "ARRAY", "items": _object(_strings("item", "allergen", "note"),
+                                                    ["item", "allergen"])},
+    "substitutes": {"type": "ARRAY", "items": _object(_strings("item", "substitute", "reason"),
+                                                      ["item", "substitute"])},
+    "counseling": {"type": "ARRAY", "items": {"type": "STRING"}},
+    "confidence": {"type": "STRING", "enum": ["high", "medium", "low"]},
+}, ["items", "confidence"])
+
+GENERATION_CONFIG = {"responseMimeType": "application/json", "responseSchema": RESPONSE_SCHEMA}
+
+# Dashboard instructions as prompt task keywords; None means the dashboard
+# answers it itself (it prints the receipt) and never sends it.
+TASKS = {
+    "Check dosage": "dosage",
+    "Check drug interactions": "interactions",
+    "Map to common allergies": "allergies",
+    "Recommend substitute drugs": "substitutes",
+    "Print as Standard PoS Receipt": None,
+}
+# Used when no instruction is selected: the task list in the schema prompt,
+# the instruction text in a free-text one.
+DEFAULT_TASKS = "dosage review"
+NO_INSTRUCTIONS = "No specific instructions."
+INFERENCE_CANCELLED = "\n\n[Safety check cancelled]"
+
+PROMPT_TEMPLATE = "Pharmacy RX safety check. Tasks: {tasks}. Fill the schema; empty lists if none.\nRX:\n{rx}"
+
+
+# =====================================================
+# PROMPT
+# =====================================================
+def prompt_tasks(instructions):
+    tasks = []
+    for instruction in normalize_instructions(instructions):
+        task = TASKS.get(instruction, instruction)
+        if task and task not in tasks:
+            tasks.append(task)
+    return ", ".join(tasks) or DEFAULT_TASKS
+
+
+def build_prompt(rx_text, instructions):
+    return PROMPT_TEMPLATE.format(tasks=prompt_tasks(instructions), rx=normalize_rx(rx_text) or "(see image)")
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count (about four characters per token)."""
+    return -(-len(text) // 4)
+
+
+# =====================================================
+# RESULTS
+# =====================================================
+def _records(record, rows):
+    return [record(**{field: row.get(field, "") for field in record._fields})
+            for row in rows or [] if isinstance(row, dict) and row]
+
+
+def _complete_prefix(fragment):
+    """The longest prefix of a truncated JSON document that parses once closed, or None."""
+    cuts, stack, in_string, escaped = [], [], False, False
+    for pos, ch in enumerate(fragment):
+        if escaped:
+            escaped = False
+        elif in_string:
+            escaped = ch == "\\"
+            in_string = ch != '"'
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cuts.append((pos + 1, "".join(reversed(stack))))
+        elif ch in "}]" and stack:
+            stack.pop()
+        elif ch == ",":
+            cuts.append((pos, "".join(reversed(stack))))
+    for pos, closing in reversed(cuts):
+        try:
+            return json.loads(fragment[:pos] + closing)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_safety_check(text, partial=False):
+    """Return ``(preface, SafetyCheck)`` for a schema JSON result, else ``(text, None)``.
+
+    ``preface`` is any text before the JSON object, such as an escalation note.
+    With ``partial``, a truncated object is parsed up to its last complete value.
+    """
+    start = (text or "").find("{")
+    if start < 0:
+        return text, None
+    try:
+        data = json.loads(text[start:])
+    except ValueError:
+        data = _complete_prefix(text[start:]) if partial else None
+    if not isinstance(data, dict) or "items" not in data:
+        return text, None
+    return text[:start], SafetyCheck(
+        items=_records(ItemFlag, data.get("items")),
+        interactions=_records(Interaction, data.get("interactions")),
+        allergies=_records(AllergyHit, data.get("allergies")),
+        substitutes=_records(Substitute, data.get("substitutes")),
+        counseling=[str(note) for note in data.get("counseling") or []],
+        confidence=str(data.get("confidence", "")),
+    )
+
+
+def _line(*parts):
+    return " – ".join(part for part in parts if part)
+
+
+def render_safety_check(text, footer=(), partial=False):
+    """Readable text for a safety-check result, with the branch ``footer`` lines appended.
+
+    ``partial`` is for an answer still streaming; a cancelled one (ending in
+    ``INFERENCE_CANCELLED``) is rendered the same way, with the note kept.
+    """
+    text = text or ""
+    cancelled = text.endswith(INFERENCE_CANCELLED)
+    if cancelled:
+        text, partial = text[:-len(INFERENCE_CANCELLED)], True
+    preface, check = parse_safety_check(text, partial)
+    if check is None and partial and "{" in text:
+        preface = text[:text.find("{")]
+        lines = [preface.strip()] if preface.strip() else []
+        lines.append("No complete fields received." if cancelled else "Receiving the safety check…")
+    elif check is None:
+        lines = [text.rstrip()]
+    else:
+        marks = {"ok": "✅", "caution": "⚠️", "stop": "⛔"}
+        lines = [preface.strip()] if preface.strip() else []
+        lines.append("Items:")
+        lines += [f"  {marks.get(flag.status, '•')} " + _line(flag.item, flag.dose, flag.note)
+                  for flag in check.items]
+        sections = [
+            ("Interactions:", [_line(f"{i.drug_a} + {i.drug_b} ({i.severity})", i.note)
+                               for i in check.interactions]),
+            ("Allergy hits:", [_line(f"{a.item}: {a.allergen}", a.note) for a in check.allergies]),
+            ("Substitutes:", [_line(f"{s.item} → {s.substitute}", s.reason) for s in check.substitutes]),
+            ("Counseling:", check.counseling),
+        ]
+        for title, rows in sections:
+            if rows:
+                lines.append(title)
+                lines += [f"  • {row}" for row in rows]
+        if check.confidence:
+            lines.append(f"Confidence: {check.confidence}")
+    if cancelled:
+        lines += ["", INFERENCE_CANCELLED.strip()]
+    if footer:
+        lines += ["", *footer]
+    return "\n".join(lines)
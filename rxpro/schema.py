@@ -0,0 +1,183 @@
+"""Table creation and versioned schema migrations for drug_data.db.
+
+All four apps share the same SQLite file, so schema changes live here and are
+applied once per database, tracked through ``PRAGMA user_version``.
+"""
+from rxpro import ids, orderlines, search
+
+
+# =====================================================
+# DATABASE TABLE CREATION
+# =====================================================
+def cust_create_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS Customers(
+                    C_Name TEXT NOT NULL,
+                    C_Password TEXT NOT NULL,
+                    C_Email TEXT PRIMARY KEY NOT NULL,
+                    C_State TEXT NOT NULL,
+                    C_Number TEXT NOT NULL)''')
+
+
+def drug_create_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS Drugs(
+                D_Name TEXT NOT NULL,
+                D_ExpDate DATE NOT NULL,
+                D_Use TEXT NOT NULL,
+                D_Qty INT NOT NULL,
+                D_id INT PRIMARY KEY NOT NULL)''')
+
+
+def order_create_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS Orders(
+                O_Name TEXT NOT NULL,
+                O_Items TEXT NOT NULL,
+                O_Qty TEXT NOT NULL,
+                O_Prices TEXT NOT NULL,
+                O_id TEXT PRIMARY KEY NOT NULL)''')
+
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+# =====================================================
+# MIGRATIONS
+# =====================================================
+def _migrate_order_lines(conn):
+    # app4.py created Orders without O_Prices; add it so every app can write lines.
+    if "O_Prices" not in _table_columns(conn, "Orders"):
+        conn.execute("ALTER TABLE Orders ADD COLUMN O_Prices TEXT NOT NULL DEFAULT ''")
+    orderlines.orderline_create_table(conn)
+    orderlines.orderline_migrate(conn)
+
+
+def _migrate_lookup_indexes(conn):
+    # Older databases may hold the same drug twice; fold duplicates into the
+    # lowest D_id (summing stock) so the unique index can be built.
+    dupes = conn.execute('''SELECT D_Name, MIN(D_id), SUM(D_Qty) FROM Drugs
+                            GROUP BY D_Name HAVING COUNT(*) > 1''').fetchall()
+    for D_Name, keep_id, total_qty in dupes:
+        conn.execute('UPDATE OrderLines SET D_id=? WHERE D_id IN '
+                     '(SELECT D_id FROM Drugs WHERE D_Name=? AND D_id<>?)', (keep_id, D_Name, keep_id))
+        conn.execute('DELETE FROM Drugs WHERE D_Name=? AND D_id<>?', (D_Name, keep_id))
+        conn.execute('UPDATE Drugs SET D_Qty=? WHERE D_id=?', (total_qty, keep_id))
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_drugs_name ON Drugs(D_Name)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_name ON Orders(O_Name)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_customers_name ON Customers(C_Name)')
+
+
+def _migrate_order_dates_and_screenings(conn):
+    # Legacy orders keep a NULL date; new ones are stamped at checkout.
+    if "O_Date" not in _table_columns(conn, "Orders"):
+        conn.execute("ALTER TABLE Orders ADD COLUMN O_Date TEXT")
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_date ON Orders(O_Date)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS RxScreenings(
+                S_id INTEGER PRIMARY KEY,
+                S_Run TEXT NOT NULL,
+                S_Source TEXT NOT NULL,
+                S_Customer TEXT,
+                S_Model TEXT NOT NULL,
+                S_Status TEXT NOT NULL,
+                S_Result TEXT NOT NULL,
+                S_Seconds REAL NOT NULL,
+                S_Date TEXT NOT NULL,
+                UNIQUE (S_Run, S_Source))''')
+
+
+def _migrate_drug_interactions(conn):
+    # I_Key is the normalized, ordered name pair (see rxpro.interactions).
+    conn.execute('''CREATE TABLE IF NOT EXISTS DrugInteractions(
+                I_Key TEXT PRIMARY KEY,
+                I_DrugA TEXT NOT NULL,
+                I_DrugB TEXT NOT NULL,
+                I_Severity TEXT NOT NULL,
+                I_Description TEXT NOT NULL)''')
+
+
+def _migrate_ade_memory(conn):
+    # Vectors are float32 blobs; see rxpro.memory.
+    conn.execute('''CREATE TABLE IF NOT EXISTS AdeMemory(
+                M_id INTEGER PRIMARY KEY,
+                M_Key TEXT NOT NULL,
+                M_Customer TEXT NOT NULL,
+                M_Order TEXT NOT NULL,
+                M_RxText TEXT NOT NULL,
+                M_Result TEXT NOT NULL,
+                M_Date TEXT NOT NULL,
+                M_Vector BLOB NOT NULL,
+                UNIQUE (M_Key, M_Customer, M_Order))''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_adememory_customer ON AdeMemory(M_Customer)')
+
+
+def _migrate_drug_prices(conn):
+    if "D_Price" not in _table_columns(conn, "Drugs"):
+        conn.execute("ALTER TABLE Drugs ADD COLUMN D_Price REAL NOT NULL DEFAULT 0")
+
+
+def _migrate_drug_search(conn):
+    search.search_create_index(conn)
+
+
+def _migrate_view_filter_indexes(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orderlines_name ON OrderLines(OL_Name COLLATE NOCASE)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_customers_state ON Customers(C_State)')
+
+
+def _migrate_id_sequences(conn):
+    ids.sequence_migrate(conn)
+
+
+def _migrate_drug_search_rowid(conn):
+    search.search_rekey_index(conn)
+
+
+def _migrate_drug_catalog_version(conn):
+    # Bumped by every write to Drugs, from any process, so the per-process
+    # catalog cache in rxpro.data can tell when it is stale.
+    conn.execute('''CREATE TABLE IF NOT EXISTS CatalogVersion(
+                CV_id INTEGER PRIMARY KEY CHECK (CV_id = 1),
+                CV_Version INTEGER NOT NULL)''')
+    conn.execute('INSERT OR IGNORE INTO CatalogVersion (CV_id, CV_Version) VALUES (1, 0)')
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS drugs_version_{event.lower()} AFTER {event} ON Drugs
+                        BEGIN UPDATE CatalogVersion SET CV_Version = CV_Version + 1 WHERE CV_id = 1; END''')
+
+
+# Append-only: the position in this list is the schema version it produces.
+MIGRATIONS = [
+    _migrate_order_lines,
+    _migrate_lookup_indexes,
+    _migrate_order_dates_and_screenings,
+    _migrate_drug_interactions,
+    _migrate_ade_memory,
+    _migrate_drug_prices,
+    _migrate_drug_search,
+    _migrate_view_filter_indexes,
+    _migrate_id_sequences,
+    _migrate_drug_search_rowid,
+    _migrate_drug_catalog_version,
+]
+
+
+def migrate(conn):
+    """Create the base tables and bring the database up to the latest version.
+
+    Each step runs in its own ``BEGIN IMMEDIATE`` transaction and re-reads
+    ``user_version`` under the write lock, so two terminals starting at once
+    cannot apply the same step twice.
+    """
+    for create in (cust_create_table, drug_create_table, order_create_table):
+        create(conn)
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                conn.execute("COMMIT")
+                return
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version={version + 1}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
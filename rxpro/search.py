@@ -0,0 +1,82 @@
+"""Typeahead search over the drug formulary.
+
+Backed by the ``DrugSearch`` FTS5 index (drug name, usage and ID, with prefix
+indexes), kept in step with ``Drugs`` by triggers. Index rows are keyed on
+``D_id`` rather than the implicit rowid, which ``VACUUM`` may renumber on a
+table without an ``INTEGER PRIMARY KEY``. Each typed word becomes a
+prefix term, so "para 500" finds "Paracetamol 500mg"; results are ranked with
+name matches first. Builds without FTS5 fall back to a prefix scan on the
+unique ``D_Name`` index.
+"""
+import re
+
+from rxpro import db
+
+SEARCH_LIMIT = 20
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_has_fts = (None, None)  # (pool, whether its database has DrugSearch)
+
+
+def search_create_index(conn):
+    """Create and fill the FTS index; returns False when FTS5 is not compiled in."""
+    try:
+        conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS DrugSearch USING fts5(
+                    D_Name, D_Use, D_id,
+                    content='Drugs', content_rowid='D_id', prefix='1 2 3')''')
+    except Exception as e:
+        if "fts5" in str(e):
+            return False
+        raise
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS drugsearch_ai AFTER INSERT ON Drugs BEGIN
+                    INSERT INTO DrugSearch(rowid, D_Name, D_Use, D_id)
+                    VALUES (new.D_id, new.D_Name, new.D_Use, new.D_id);
+                END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS drugsearch_ad AFTER DELETE ON Drugs BEGIN
+                    INSERT INTO DrugSearch(DrugSearch, rowid, D_Name, D_Use, D_id)
+                    VALUES ('delete', old.D_id, old.D_Name, old.D_Use, old.D_id);
+                END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS drugsearch_au AFTER UPDATE OF D_Name, D_Use, D_id ON Drugs BEGIN
+                    INSERT INTO DrugSearch(DrugSearch, rowid, D_Name, D_Use, D_id)
+                    VALUES ('delete', old.D_id, old.D_Name, old.D_Use, old.D_id);
+                    INSERT INTO DrugSearch(rowid, D_Name, D_Use, D_id)
+                    VALUES (new.D_id, new.D_Name, new.D_Use, new.D_id);
+                END''')
+    conn.execute("INSERT INTO DrugSearch(DrugSearch) VALUES ('rebuild')")
+    return True
+
+
+def search_rekey_index(conn):
+    """Recreate an index built on the implicit ``Drugs`` rowid so it is keyed on ``D_id``."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name='DrugSearch'").fetchone()
+    if row is None or "content_rowid" in row[0]:
+        return
+    for trigger in ("drugsearch_ai", "drugsearch_ad", "drugsearch_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE DrugSearch")
+    search_create_index(conn)
+
+
+def _fts_available():
+    # cached per pool, so db.configure() pointing at another file re-checks
+    global _has_fts
+    pool = db.get_pool()
+    if _has_fts[0] is not pool:
+        _has_fts = (pool, db.fetchone("SELECT 1 FROM sqlite_master WHERE name='DrugSearch'") is not None)
+    return _has_fts[1]
+
+
+def drug_search(query, limit=SEARCH_LIMIT):
+    """Top ``limit`` ``(D_Name, D_id, D_Price)`` matches for a typed query."""
+    words = _WORD.findall(query or "")
+    if not words:
+        return db.fetchall('SELECT D_Name, D_id, D_Price FROM Drugs ORDER BY D_Name LIMIT ?', (limit,))
+    if _fts_available():
+        match = " ".join(f'"{w}"*' for w in words)
+        return db.fetchall('''SELECT d.D_Name, d.D_id, d.D_Price
+                              FROM DrugSearch s JOIN Drugs d ON d.D_id = s.rowid
+                              WHERE DrugSearch MATCH ?
+                              ORDER BY bm25(DrugSearch, 10.0, 1.0, 5.0) LIMIT ?''', (match, limit))
+    prefix = " ".join(words)
+    return db.fetchall('SELECT D_Name, D_id, D_Price FROM Drugs WHERE D_Name >= ? AND D_Name < ? '
+                       'ORDER BY D_Name LIMIT ?', (prefix, prefix + "\uffff", limit))
@@ -0,0 +1,121 @@
+"""Shared Streamlit views for the dashboards."""
+import math
+
+import pandas as pd
+import streamlit as st
+
+from rxpro import backend
+from rxpro.backend import customer_count, customer_page, orderline_count, orderline_page
+from rxpro.exports import EXPORT_FORMATS, export_sales_summary
+from rxpro.inventory import drug_import_upload, format_import_report
+from rxpro.orderlines import ORDER_LINE_COLUMNS
+
+PAGE_SIZES = [25, 50, 100, 250]
+CUSTOMER_COLUMNS = ["Name", "Password", "Email", "State", "Phone"]
+
+
+# =====================================================
+# KEYSET PAGER
+# =====================================================
+def _pager_state(key, filters):
+    """Cursor stack for ``key``; going back to page 1 whenever the filters change."""
+    state = st.session_state.setdefault(key, {"filters": None, "cursors": [None]})
+    if state["filters"] != filters:
+        state["filters"] = filters
+        state["cursors"] = [None]
+    return state
+
+
+def _pager_controls(key, state, rows, row_count, page_size):
+    page = len(state["cursors"])
+    pages = max(1, math.ceil(row_count / page_size))
+    col1, col2, col3 = st.columns([1, 4, 1])
+    with col1:
+        if st.button("◀ Prev", key=f"{key}_prev", disabled=page == 1):
+            state["cursors"].pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page} of {pages} · {row_count} rows")
+    with col3:
+        if st.button("Next ▶", key=f"{key}_next", disabled=page >= pages or not rows):
+            state["cursors"].append(rows[-1][-1])
+            st.rerun()
+
+
+# =====================================================
+# VIEWS
+# =====================================================
+def order_lines_view(key, currency, customer=None, total_label="Total",
+                     empty_message="No orders found."):
+    """Filtered, paginated order lines; pass ``customer`` to lock the view to one customer."""
+    cols = st.columns(4)
+    if customer is None:
+        customer = cols[0].text_input("Customer", key=f"{key}_customer").strip()
+    item = cols[1].text_input("Item", key=f"{key}_item").strip()
+    dates = cols[2].date_input("Date range", value=(), key=f"{key}_dates")
+    page_size = cols[3].selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+    filters = {
+        "customer": customer or None,
+        "item": item or None,
+        "date_from": dates[0] if len(dates) > 0 else None,
+        "date_to": dates[1] if len(dates) > 1 else (dates[0] if dates else None),
+    }
+
+    row_count, total = orderline_count(**filters)
+    if not row_count:
+        st.info(empty_message)
+        return 0
+    state = _pager_state(key, (tuple(filters.items()), page_size))
+    rows = orderline_page(after=state["cursors"][-1], page_size=page_size, **filters)
+    df = pd.DataFrame([row[:7] for row in rows], columns=ORDER_LINE_COLUMNS + ["Date"])
+    st.dataframe(df, use_container_width=True)
+    _pager_controls(key, state, rows, row_count, page_size)
+    st.markdown(f"### 💰 {total_label}: {currency}{total}")
+    return row_count
+
+
+def sales_summary_download(key, customer, qty_label="Qtys"):
+    """Download button whose file is only built, from a streamed query, when clicked."""
+    fmt = st.radio("Summary format", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_format")
+    ext, mime = EXPORT_FORMATS[fmt]
+    st.download_button(
+        label="🧾 Download Sales Summary",
+        data=lambda: export_sales_summary(customer, fmt, qty_label),
+        file_name=f"{customer}_receipt.{ext}",
+        mime=mime,
+        key=f"{key}_download",
+    )
+
+
+def drug_import_view(key):
+    """Admin upload for a supplier CSV in the ``drugs.csv`` layout."""
+    if backend.BACKEND != "sqlite":
+        st.info("Bulk CSV import writes the flat Drugs table and is only available on the sqlite backend.")
+        return
+    uploaded = st.file_uploader("Supplier CSV (D_Name, D_ExpDate, D_Use, D_Qty, D_id, D_Price)",
+                                type=["csv"], key=f"{key}_csv")
+    if uploaded is not None and st.button("Import", key=f"{key}_import"):
+        report = drug_import_upload(uploaded)
+        summary, _, details = format_import_report(report).partition("\n")
+        (st.warning if report.rejected else st.success)(summary)
+        if details:
+            st.text(details)
+
+
+def customers_view(key):
+    col1, col2, col3 = st.columns([2, 2, 1])
+    name = col1.text_input("Name starts with", key=f"{key}_name").strip()
+    branch = col2.text_input("Branch", key=f"{key}_branch").strip()
+    page_size = col3.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+    filters = {"name": name or None, "branch": branch or None}
+
+    row_count = customer_count(**filters)
+    if not row_count:
+        st.info("No registered customers yet." if not (name or branch) else "No matching customers.")
+        return 0
+    state = _pager_state(key, (tuple(filters.items()), page_size))
+    rows = customer_page(after=state["cursors"][-1], page_size=page_size, **filters)
+    st.dataframe(pd.DataFrame([row[:5] for row in rows], columns=CUSTOMER_COLUMNS),
+                 use_container_width=True)
+    _pager_controls(key, state, rows, row_count, page_size)
+    return row_count